@@ -0,0 +1,36 @@
+import importlib
+
+__version__ = "0.2.36"
+
+# Public names and the submodule that defines them. Submodules (and their dependencies, e.g. nltk)
+# are only imported when one of their names is used.
+_exports = {
+    "ReadCalc": "readcalc",
+    "score_many": "batch",
+    "configure_syllable_cache": "syllables",
+    "syllable_cache_info": "syllables",
+    "ReadCalcAccumulator": "stream",
+    "ReadabilityCounts": "counts",
+    "HyperLogLog": "counts",
+    "ReadCalcStats": "stats",
+    "AsyncScorer": "aio",
+    "ascore": "aio",
+    "ascore_many": "aio",
+    "ResultCache": "cache",
+    "ReadabilityProfile": "profile",
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import sys
+
+from .cli import main
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+sys.exit(main())
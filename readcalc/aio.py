@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from .batch import _init_worker, _score, _score_counts
+from .cache import make_key
+from .readcalc import ReadCalc
+from .stats import LatencyHistogram
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+_default_scorer = None
+_logger = logging.getLogger(__name__)
+
+
+def _score_batch(items, counts=False):
+    """
+        Scores a list of (text, options) in a worker. Returns one (ok, metrics or exception) per item,
+        so that a bad document does not fail the other documents of the batch.
+        With counts=True, the ReadabilityCounts of each text are returned instead of its metrics.
+    """
+    score = _score_counts if counts else _score
+    results = []
+    for text, options in items:
+        try:
+            results.append((True, score(text, dict(options))))
+        except Exception as error:
+            results.append((False, error))
+    return results
+
+
+def _put_many(cache, items):
+    for key, counts in items:
+        cache.put(key, counts)
+
+
+class AsyncScorer:
+
+    def __init__(self, workers=None, max_pending=1024, batch_size=32, batch_delay=0.002, language="en",
+                 tokenizer="nltk", executor=None, cache=None):
+        """
+            AsyncScorer(workers=None, max_pending=1024, batch_size=32, batch_delay=0.002, language="en",
+                        tokenizer="nltk", executor=None, cache=None).
+
+            Scores texts from asyncio code in a pool of worker processes, without blocking the event loop
+            (preprocess_html, tokenization and syllables all run in the workers).
+            Must be used from a single event loop.
+
+            The pool is created on first use, or by start(). Programs that accept connections should call
+            start() before opening any socket: forked workers keep a copy of every socket open at that time,
+            so a connection closed by the server would never be closed for its client.
+
+            workers:
+              Number of processes. Default (None) is the number of cores.
+              Use workers=1 to score in one background thread of the current process instead.
+
+            max_pending:
+              Maximum number of documents queued or being scored. Once it is reached, score() waits
+              until a document is done, so that fast producers cannot fill the memory (backpressure).
+
+            batch_size, batch_delay:
+              Documents are sent to the workers in batches of up to batch_size documents, waiting at most
+              batch_delay seconds for a batch to fill up. Identical documents (same text and options) that are
+              waiting at the same time are scored only once (request coalescing).
+
+            language, tokenizer:
+              Resources loaded in advance by each worker. Other languages or tokenizers can still be
+              requested, they are loaded on first use.
+
+            executor:
+              A concurrent.futures.Executor to use instead of creating one. It is not shut down by close().
+
+            cache:
+              A cache.ResultCache. Documents found in it are answered without going to the workers.
+              If it has an sqlite tier, it is read and written in a background thread.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.language = language
+        self.tokenizer = tokenizer
+        self.cache = cache
+
+        self.__executor = executor
+        self.__owns_executor = executor is None
+        # Thread for the disk tier of the cache, and results being stored there
+        self.__io = None
+        self.__stores = set()
+        self.__slots = asyncio.Semaphore(max_pending)
+        self.__inflight = {}
+        self.__batch = []
+        self.__timer = None
+
+        self.documents = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def __repr__(self):
+        return "AsyncScorer(workers=%r, pending=%d, documents=%d, coalesced=%d, batches=%d, errors=%d)" %\
+                (self.workers, self.get_pending(), self.documents, self.coalesced, self.batches, self.errors)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def __get_executor(self):
+        if self.__executor is None:
+            if self.workers == 1:
+                self.__executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker,
+                                                     initargs=(self.language, self.tokenizer))
+            else:
+                self.__executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                      initargs=(self.language, self.tokenizer))
+        return self.__executor
+
+    def __get_io(self):
+        if self.__io is None:
+            self.__io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readcalc-cache")
+        return self.__io
+
+    async def start(self):
+        """
+            Creates the worker pool now and waits until its workers are running. Returns the scorer itself.
+        """
+        await asyncio.get_running_loop().run_in_executor(self.__get_executor(), _score_batch, [])
+        return self
+
+    def get_pending(self):
+        """
+            Number of distinct documents queued or being scored.
+        """
+        return len(self.__inflight)
+
+    async def score(self, text, language="en", preprocesshtml=None, forcePeriod=False, tokenizer="nltk"):
+        """
+            Returns the tuple of ReadCalc(text, ...).get_all_metrics(), computed in a worker.
+            Exceptions raised by ReadCalc are raised here.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_key(text, language, preprocesshtml, forcePeriod, tokenizer)
+            if self.cache.path is None:
+                counts = self.cache.get(cache_key)
+            else:
+                counts = await asyncio.get_running_loop().run_in_executor(self.__get_io(), self.cache.get, cache_key)
+            if counts is not None:
+                return ReadCalc.from_counts(counts, language, tokenizer).get_all_metrics()
+
+        key = (text, (("language", language), ("preprocesshtml", preprocesshtml), ("forcePeriod", forcePeriod),
+                      ("tokenizer", tokenizer)))
+        future = self.__inflight.get(key)
+        if future is None:
+            await self.__slots.acquire()
+            # Someone else may have submitted the same document while we were waiting
+            future = self.__inflight.get(key)
+            if future is None:
+                future = self.__submit(key, cache_key)
+            else:
+                self.__slots.release()
+                self.coalesced += 1
+        else:
+            self.coalesced += 1
+        # Shielded: a cancelled caller must not cancel the result shared with other callers
+        return await asyncio.shield(future)
+
+    async def score_many(self, texts, language="en", preprocesshtml=None, forcePeriod=False, tokenizer="nltk",
+                         return_exceptions=False):
+        """
+            Scores all texts concurrently and returns the list of their metrics, in order.
+            With return_exceptions=True, the exception of a failed text is put in its place instead of raised.
+        """
+        tasks = [self.score(text, language, preprocesshtml, forcePeriod, tokenizer) for text in texts]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    def __submit(self, key, cache_key):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__inflight[key] = future
+        future.add_done_callback(partial(self.__release, key))
+        self.__batch.append((key, future, loop.time(), cache_key))
+        self.documents += 1
+
+        if len(self.__batch) >= self.batch_size:
+            self.__flush()
+        elif self.__timer is None:
+            self.__timer = loop.call_later(self.batch_delay, self.__flush)
+        return future
+
+    def __release(self, key, future):
+        del self.__inflight[key]
+        self.__slots.release()
+
+    def __flush(self):
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        batch, self.__batch = self.__batch, []
+        if not batch:
+            return
+
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(self.__get_executor(), _score_batch, [item[0] for item in batch],
+                                    self.cache is not None)
+        work.add_done_callback(partial(self.__resolve, batch, loop))
+
+    def __resolve(self, batch, loop, work):
+        if work.cancelled():
+            results = [(False, asyncio.CancelledError())] * len(batch)
+        elif work.exception() is not None:
+            # E.g., a worker process died: every document of the batch fails
+            results = [(False, work.exception())] * len(batch)
+        else:
+            results = work.result()
+
+        now = loop.time()
+        stores = []
+        for (key, future, start, cache_key), (ok, value) in zip(batch, results):
+            self.latency.observe(now - start)
+            # Every future must be resolved, otherwise its slot and its entry in __inflight are never released
+            try:
+                if ok and cache_key is not None:
+                    stores.append((cache_key, value))
+                    options = dict(key[1])
+                    value = ReadCalc.from_counts(value, options["language"], options["tokenizer"]).get_all_metrics()
+            except Exception as error:
+                ok, value = False, error
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                self.errors += 1
+                future.set_exception(value)
+        if stores:
+            self.__store(stores, loop)
+
+    def __store(self, items, loop):
+        """
+            Stores the counts of scored documents in the cache. A failure is logged: the documents were scored.
+        """
+        if self.cache.path is None:
+            try:
+                _put_many(self.cache, items)
+            except Exception as error:
+                _logger.warning("Could not store results in the cache: %r", error)
+            return
+        store = loop.run_in_executor(self.__get_io(), _put_many, self.cache, items)
+        self.__stores.add(store)
+        store.add_done_callback(self.__stored)
+
+    def __stored(self, store):
+        self.__stores.discard(store)
+        if not store.cancelled() and store.exception() is not None:
+            _logger.warning("Could not store results in the cache: %r", store.exception())
+
+    def summary(self):
+        """
+            Returns a dictionary with the counters and the latency histogram (queue + scoring time per document).
+        """
+        return {
+            "documents": self.documents,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "errors": self.errors,
+            "pending": self.get_pending(),
+            "max_pending": self.max_pending,
+            "latency": self.latency.summary(),
+            "cache": self.cache.summary() if self.cache is not None else None,
+        }
+
+    def close(self, wait=True):
+        """
+            Sends the documents still waiting for a batch and shuts down the worker pool created by this scorer.
+            With wait=True, it blocks until the workers are done: use aclose() from a coroutine.
+        """
+        if self.__batch:
+            self.__flush()
+        self.__shutdown(wait)
+
+    def __shutdown(self, wait):
+        if self.__executor is not None and self.__owns_executor:
+            self.__executor.shutdown(wait=wait)
+            self.__executor = None
+        if self.__io is not None:
+            self.__io.shutdown(wait=wait)
+            self.__io = None
+
+    async def aclose(self):
+        """
+            Same as close(), without blocking the event loop: waits for the documents being scored and stored
+            in the cache, then shuts down the worker pool in a thread.
+        """
+        if self.__batch:
+            self.__flush()
+        if self.__inflight:
+            await asyncio.wait(list(self.__inflight.values()))
+        if self.__stores:
+            await asyncio.wait(list(self.__stores))
+        await asyncio.get_running_loop().run_in_executor(None, self.__shutdown, True)
+
+
+def get_default_scorer():
+    """
+        Returns the AsyncScorer used by ascore() and ascore_many(), created (with default options) on first use.
+        A server using ascore() should await get_default_scorer().start() before opening its sockets.
+    """
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = AsyncScorer()
+    return _default_scorer
+
+
+async def ascore(text, language="en", preprocesshtml=None, forcePeriod=False, tokenizer="nltk"):
+    """
+        await ascore(text, ...) returns ReadCalc(text, ...).get_all_metrics(), computed by the default AsyncScorer.
+    """
+    return await get_default_scorer().score(text, language, preprocesshtml, forcePeriod, tokenizer)
+
+
+async def ascore_many(texts, language="en", preprocesshtml=None, forcePeriod=False, tokenizer="nltk",
+                      return_exceptions=False):
+    """
+        Same as ascore() for a list of texts. Returns the list of their metrics, in order.
+    """
+    return await get_default_scorer().score_many(texts, language, preprocesshtml, forcePeriod, tokenizer,
+                                                 return_exceptions)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import queue
+from collections import deque
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+
+from .readcalc import ReadCalc, _get_word_tokenizer, _sent_tokenize
+from .syllables import get_syllable_counter
+from .dalechallwords import get_dale_chall_words
+from .cache import make_key
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+# Names of the values returned by ReadCalc.get_all_metrics(), in the same order
+METRIC_NAMES = ("number_chars", "number_words", "number_types", "number_sentences", "number_syllables",
+                "number_polysyllable_words", "difficult_words", "number_words_longer_4", "number_words_longer_6",
+                "number_words_longer_10", "number_words_longer_13", "flesch_reading_ease",
+                "flesch_kincaid_grade_level", "coleman_liau_index", "gunning_fog_index", "smog_index", "ari_index",
+                "lix_index", "dale_chall_score")
+
+
+def _init_worker(language, tokenizer="nltk"):
+    """
+        Loads the pyphen dictionary, the NLTK tokenizers and the Dale-Chall list once per worker process.
+    """
+    get_syllable_counter(language)
+    if tokenizer == "nltk":
+        _get_word_tokenizer()
+        try:
+            _sent_tokenize("Warm up.")
+        except LookupError:
+            # Punkt is not installed. Every document will report the error when it is scored.
+            pass
+    get_dale_chall_words()
+
+
+def _score(text, options):
+    return ReadCalc(text, **options).get_all_metrics()
+
+
+def metrics_to_dict(metrics):
+    """
+        Turns the tuple returned by ReadCalc.get_all_metrics() into a dictionary {name: value}.
+    """
+    return dict(zip(METRIC_NAMES, metrics))
+
+
+def _score_indexed(item, options):
+    position, text = item
+    return position, _score(text, options)
+
+
+def _score_counts(text, options):
+    return ReadCalc(text, **options).get_counts()
+
+
+def _map_chunk(function, chunk):
+    return [function(item) for item in chunk]
+
+
+def _next_chunk(done):
+    result = done.get()
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def _imap_bounded(pool, function, items, chunksize, max_chunks, ordered=True):
+    """
+        Same as pool.imap (or pool.imap_unordered if ordered is False), but it only reads max_chunks chunks of
+        items ahead of the results. pool.imap reads the whole iterable as fast as it can, so the memory it
+        takes grows with the input when the workers are slower than the reader.
+    """
+    items = iter(items)
+    chunks = iter(lambda: list(islice(items, chunksize)), [])
+    if ordered:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_map_chunk, (function, chunk)))
+            if len(pending) >= max_chunks:
+                for result in pending.popleft().get():
+                    yield result
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+    else:
+        done = queue.Queue()
+        running = 0
+        for chunk in chunks:
+            pool.apply_async(_map_chunk, (function, chunk), callback=done.put, error_callback=done.put)
+            running += 1
+            if running >= max_chunks:
+                for result in _next_chunk(done):
+                    yield result
+                running -= 1
+        while running:
+            for result in _next_chunk(done):
+                yield result
+            running -= 1
+
+
+def _score_cached(texts, pool, cache, options, chunksize, ordered, block_size):
+    """
+        score_many with a ResultCache: the texts are read in blocks, looked up in the cache, and only the
+        (distinct) misses are sent to the workers, which return their counts to be stored in the cache.
+    """
+    language, tokenizer = options["language"], options["tokenizer"]
+    texts = iter(texts)
+    offset = 0
+    while True:
+        block = list(islice(texts, block_size))
+        if not block:
+            return
+
+        keys = [make_key(text, **options) for text in block]
+        results = [None] * len(block)
+        missing = {}
+        for i, key in enumerate(keys):
+            counts = cache.get(key)
+            if counts is not None:
+                results[i] = ReadCalc.from_counts(counts, language, tokenizer).get_all_metrics()
+                if not ordered:
+                    yield offset + i, results[i]
+            elif key not in missing:
+                missing[key] = i
+
+        if missing:
+            positions = list(missing.values())
+            work = [block[i] for i in positions]
+            if pool is None:
+                computed = (_score_counts(text, options) for text in work)
+            else:
+                computed = pool.imap(partial(_score_counts, options=options), work, chunksize)
+            for i, counts in zip(positions, computed):
+                cache.put(keys[i], counts)
+                results[i] = ReadCalc.from_counts(counts, language, tokenizer).get_all_metrics()
+                if not ordered:
+                    yield offset + i, results[i]
+
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                # Same text as an earlier one of this block
+                results[i] = results[missing[key]]
+                if not ordered:
+                    yield offset + i, results[i]
+        if ordered:
+            for metrics in results:
+                yield metrics
+        offset += len(block)
+
+
+def score_many(texts, workers=None, chunksize=64, ordered=True, language="en", preprocesshtml=None,
+               forcePeriod=False, tokenizer="nltk", cache=None):
+    """
+        score_many(texts, workers=None, chunksize=64, ordered=True, language="en", preprocesshtml=None,
+                   forcePeriod=False, tokenizer="nltk", cache=None).
+
+        Scores every text of an iterable in a pool of processes and yields the tuple returned by
+        ReadCalc.get_all_metrics() for each one of them.
+
+        texts:
+          Any iterable of strings. It is consumed lazily (at most a few chunks per worker ahead of the results),
+          so generators over large corpora are fine.
+
+        workers:
+          Number of processes. Default (None) is the number of cores.
+          Use workers=1 to score everything in the current process.
+
+        chunksize:
+          Number of texts sent to a worker at once. Larger chunks lower the inter-process overhead,
+          smaller chunks balance uneven documents better.
+
+        ordered:
+          If True (default) results are yielded in the same order as the input.
+          If False, pairs (position, metrics) are yielded as soon as they are ready,
+          where position is the index of the text in the input.
+
+        language, preprocesshtml, forcePeriod, tokenizer:
+          Same as in ReadCalc.
+
+        cache:
+          A cache.ResultCache. Texts found in it are not sent to the workers, and the results of the other
+          texts are added to it. Texts are then read in blocks of a few chunks per worker.
+    """
+    options = {"language": language, "preprocesshtml": preprocesshtml, "forcePeriod": forcePeriod,
+               "tokenizer": tokenizer}
+
+    if workers == 1:
+        _init_worker(language, tokenizer)
+        if cache is not None:
+            for item in _score_cached(texts, None, cache, options, chunksize, ordered, chunksize):
+                yield item
+            return
+        for position, text in enumerate(texts):
+            metrics = _score(text, options)
+            yield metrics if ordered else (position, metrics)
+        return
+
+    max_chunks = (workers or os.cpu_count() or 1) * 4
+    with Pool(processes=workers, initializer=_init_worker, initargs=(language, tokenizer)) as pool:
+        if cache is not None:
+            for item in _score_cached(texts, pool, cache, options, chunksize, ordered, chunksize * max_chunks):
+                yield item
+        elif ordered:
+            for metrics in _imap_bounded(pool, partial(_score, options=options), texts, chunksize, max_chunks):
+                yield metrics
+        else:
+            for item in _imap_bounded(pool, partial(_score_indexed, options=options), enumerate(texts), chunksize,
+                                      max_chunks, ordered=False):
+                yield item
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+    Benchmarks of ReadCalc on synthetic corpora.
+
+    python -m readcalc.bench                           ---- Prints docs/sec, tokens/sec and peak memory per stage,
+                                                            and the import and first call times.
+    python -m readcalc.bench --save baseline.json      ---- Also saves the results.
+    python -m readcalc.bench --baseline baseline.json  ---- Fails (exit code 1) if any stage got slower than
+                                                            the baseline by more than --threshold.
+"""
+
+from __future__ import division
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from .readcalc import ReadCalc, _count_sentences, _iter_words, _sent_tokenize
+from . import fasttokenize
+from .syllables import get_syllable_counter
+from .preprocessing import preprocess_html
+from .dalechallwords import get_dale_chall_words
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+LONG_WORDS = ["accessibility", "administration", "approximately", "characteristic", "communication",
+              "comprehension", "consideration", "development", "environmental", "establishment",
+              "extraordinary", "infrastructure", "interpretation", "investigation", "neighbourhood",
+              "organization", "participation", "predominantly", "recommendation", "responsibility"]
+
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reference.txt")
+
+# (number of documents, sentences per document) at scale 1.0
+CORPORA = {
+    "tweets": (2000, 2),
+    "news": (200, 40),
+    "book": (2, 5000),
+    "html": (200, 40),
+}
+
+
+def make_sentence(rng, vocabulary):
+    words = [rng.choice(LONG_WORDS) if rng.random() < 0.15 else rng.choice(vocabulary)
+             for _ in range(rng.randint(5, 25))]
+    words[0] = words[0].capitalize()
+    if len(words) > 8:
+        words[len(words) // 2] += ","
+    return " ".join(words) + rng.choice([".", ".", ".", "?", "!"])
+
+
+def make_text(rng, vocabulary, sentences):
+    paragraphs = []
+    while sentences > 0:
+        size = min(sentences, rng.randint(2, 6))
+        paragraphs.append(" ".join(make_sentence(rng, vocabulary) for _ in range(size)))
+        sentences -= size
+    return "\n\n".join(paragraphs)
+
+
+def make_html(rng, vocabulary, sentences):
+    paragraphs = make_text(rng, vocabulary, sentences).split("\n\n")
+    return ("<html><head><title>Benchmark</title><style>p { margin: 0; }</style>"
+            "<script>var page = {id: %d};</script></head><body><div class=\"content\">%s</div>"
+            "<footer><a href=\"/\">Home</a></footer></body></html>") %\
+            (rng.randint(0, 10 ** 6), "".join("<p>%s</p>" % (p) for p in paragraphs))
+
+
+def load_reference():
+    """
+        Returns the paragraphs of the bundled reference corpus of English prose.
+    """
+    with open(REFERENCE_FILE, encoding="utf-8") as f:
+        return [paragraph.strip() for paragraph in f.read().split("\n\n") if paragraph.strip()]
+
+
+def make_corpus(name, scale=1.0, seed=42):
+    """
+        Returns a list of synthetic documents. The same name, scale and seed always give the same corpus.
+    """
+    rng = random.Random(seed)
+    vocabulary = sorted(get_dale_chall_words())
+    documents, sentences = CORPORA[name]
+    documents = max(1, int(documents * scale))
+    if name == "html":
+        return [make_html(rng, vocabulary, sentences) for _ in range(documents)]
+    return [make_text(rng, vocabulary, sentences) for _ in range(documents)]
+
+
+def stage_sentences(texts, language):
+    for text in texts:
+        _sent_tokenize(text)
+
+
+def stage_words(texts, language):
+    for text in texts:
+        for word in _iter_words(text):
+            pass
+
+
+def stage_fast_sentences(texts, language):
+    for text in texts:
+        fasttokenize.sent_tokenize(text)
+
+
+def stage_fast_words(texts, language):
+    for text in texts:
+        for word in fasttokenize.iter_words(text):
+            pass
+
+
+def stage_syllables(words, language):
+    counter = get_syllable_counter(language)
+    counter.clear()
+    for word in words:
+        counter.count(word)
+
+
+def stage_dale_chall(words, language):
+    dale_chall_words = get_dale_chall_words()
+    for word in words:
+        word in dale_chall_words
+
+
+def stage_readcalc(texts, language):
+    for text in texts:
+        ReadCalc(text, language=language).get_all_metrics()
+
+
+def stage_readcalc_fast(texts, language):
+    for text in texts:
+        ReadCalc(text, language=language, tokenizer="fast").get_all_metrics()
+
+
+def make_stage_preprocess(preprocessor):
+    def stage_preprocess(texts, language):
+        for text in texts:
+            preprocess_html(text, preprocessor, True)
+    return stage_preprocess
+
+
+def measure(function, items, language, repeat):
+    """
+        Returns (best time in seconds, peak memory in bytes) of function(items, language).
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(items, language)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    function(items, language)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+STARTUP_SCRIPTS = {
+    "import": "import readcalc.readcalc",
+    "first_call": "import readcalc.readcalc\nreadcalc.readcalc.ReadCalc('This is a short text. It has two sentences.').get_all_metrics()",
+}
+
+TIMER = "import time\nstart = time.perf_counter()\n%s\nprint(time.perf_counter() - start)"
+
+
+def measure_startup(repeat=5):
+    """
+        Times, in fresh interpreters, the import of readcalc and the import plus the first ReadCalc
+        (which loads nltk, punkt, pyphen and the Dale-Chall list). Returns {"startup/...": results}.
+    """
+    results = {}
+    for name, script in sorted(STARTUP_SCRIPTS.items()):
+        times = [float(subprocess.check_output([sys.executable, "-c", TIMER % (script)]).split()[-1])
+                 for _ in range(repeat)]
+        seconds = max(min(times), 1e-9)
+        results["startup/" + name] = {"docs": 1, "tokens": 0, "seconds": seconds, "docs_per_sec": 1.0 / seconds,
+                                      "tokens_per_sec": 0.0, "peak_memory_kb": 0.0}
+    return results
+
+
+def run(corpora=None, scale=1.0, repeat=3, language="en", preprocessors=("fast", "bs4", "justext")):
+    """
+        Runs every stage on every corpus. Returns a dictionary {"corpus/stage": results}.
+    """
+    results = {}
+    for name in corpora or sorted(CORPORA):
+        documents = make_corpus(name, scale)
+        stages = []
+
+        if name == "html":
+            for preprocessor in preprocessors:
+                stages.append(("preprocess_" + preprocessor, make_stage_preprocess(preprocessor), documents))
+            texts = [preprocess_html(document, "fast", True) for document in documents]
+        else:
+            texts = documents
+
+        words = [word for text in texts for word in _iter_words(text)]
+        stages += [("sentences", stage_sentences, texts),
+                   ("words", stage_words, texts),
+                   ("fast_sentences", stage_fast_sentences, texts),
+                   ("fast_words", stage_fast_words, texts),
+                   ("syllables", stage_syllables, words),
+                   ("dale_chall", stage_dale_chall, words),
+                   ("readcalc", stage_readcalc, texts),
+                   ("readcalc_fast", stage_readcalc_fast, texts)]
+
+        for stage, function, items in stages:
+            seconds, peak = measure(function, items, language, repeat)
+            seconds = max(seconds, 1e-9)
+            results["%s/%s" % (name, stage)] = {
+                "docs": len(documents),
+                "tokens": len(words),
+                "seconds": seconds,
+                "docs_per_sec": len(documents) / seconds,
+                "tokens_per_sec": len(words) / seconds,
+                "peak_memory_kb": peak / 1024.0,
+            }
+    return results
+
+
+def tokenizer_divergence(texts):
+    """
+        Compares the fast tokenizer with NLTK on the given texts. Returns a dictionary with the total number
+        of sentences and words found by each one, and their divergence: the sum over texts of the absolute
+        difference of the counts, divided by the NLTK total.
+    """
+    result = {"sentences_nltk": 0, "sentences_fast": 0, "words_nltk": 0, "words_fast": 0,
+              "sentence_divergence": 0.0, "word_divergence": 0.0}
+    sentence_diff = word_diff = 0
+    for text in texts:
+        sentences = (_count_sentences(_sent_tokenize(text)), _count_sentences(fasttokenize.sent_tokenize(text)))
+        words = (sum(1 for _ in _iter_words(text)), sum(1 for _ in fasttokenize.iter_words(text)))
+        result["sentences_nltk"] += sentences[0]
+        result["sentences_fast"] += sentences[1]
+        result["words_nltk"] += words[0]
+        result["words_fast"] += words[1]
+        sentence_diff += abs(sentences[0] - sentences[1])
+        word_diff += abs(words[0] - words[1])
+    if result["sentences_nltk"]:
+        result["sentence_divergence"] = sentence_diff / result["sentences_nltk"]
+    if result["words_nltk"]:
+        result["word_divergence"] = word_diff / result["words_nltk"]
+    return result
+
+
+def print_divergence(corpora, scale, out=sys.stdout):
+    out.write("\n%-28s %10s %10s %10s %10s %10s %10s\n" % ("tokenizer divergence", "sent nltk", "sent fast",
+                                                              "sent div", "word nltk", "word fast", "word div"))
+    sources = [("reference", load_reference())]
+    for name in corpora or sorted(CORPORA):
+        documents = make_corpus(name, scale)
+        if name == "html":
+            documents = [preprocess_html(document, "fast", True) for document in documents]
+        sources.append((name, documents))
+    for name, texts in sources:
+        d = tokenizer_divergence(texts)
+        out.write("%-28s %10d %10d %9.2f%% %10d %10d %9.2f%%\n" %
+                  (name, d["sentences_nltk"], d["sentences_fast"], 100.0 * d["sentence_divergence"],
+                   d["words_nltk"], d["words_fast"], 100.0 * d["word_divergence"]))
+
+
+def compare(results, baseline, threshold):
+    """
+        Returns a list of (key, baseline value, current value, unit) for every stage that got slower
+        than the baseline by more than threshold (e.g. 0.2 = 20%).
+        Stages are compared by tokens/sec, startup times by seconds.
+    """
+    regressions = []
+    for key, expected in sorted(baseline.items()):
+        if key not in results:
+            continue
+        if key.startswith("startup/"):
+            current = results[key]["seconds"]
+            if current > expected["seconds"] * (1.0 + threshold):
+                regressions.append((key, expected["seconds"], current, "seconds"))
+        else:
+            current = results[key]["tokens_per_sec"]
+            if current < expected["tokens_per_sec"] * (1.0 - threshold):
+                regressions.append((key, expected["tokens_per_sec"], current, "tokens/sec"))
+    return regressions
+
+
+def print_results(results, out=sys.stdout):
+    out.write("%-28s %12s %14s %10s %14s\n" % ("stage", "docs/sec", "tokens/sec", "seconds", "peak mem (KB)"))
+    for key, result in sorted(results.items()):
+        out.write("%-28s %12.1f %14.1f %10.4f %14.1f\n" % (key, result["docs_per_sec"], result["tokens_per_sec"],
+                                                           result["seconds"], result["peak_memory_kb"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m readcalc.bench", description="Benchmarks ReadCalc.")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA),
+                        help="Corpus to run. Can be repeated. Default is all of them.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies the number of documents.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each stage. The best one is reported.")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--save", help="Saves the results as JSON in this file.")
+    parser.add_argument("--baseline", help="JSON file saved with --save to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Largest accepted drop of tokens/sec (or increase of startup time) relative to "
+                             "the baseline. Default is 0.2.")
+    parser.add_argument("--no-startup", action="store_true", help="Skips the import and first call timings.")
+    args = parser.parse_args(argv)
+
+    results = run(args.corpus, args.scale, args.repeat, args.language)
+    if not args.no_startup:
+        results.update(measure_startup())
+    print_results(results)
+    print_divergence(args.corpus, args.scale)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for key, expected, current, unit in regressions:
+            print("REGRESSION %s: %.4f %s (baseline %.4f)" % (key, current, unit, expected))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from __future__ import division
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from hashlib import blake2b
+
+from . import __version__
+from .counts import ReadabilityCounts
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+
+def make_key(text, language="en", preprocesshtml=None, forcePeriod=False, tokenizer="nltk"):
+    """
+        Returns the cache key of a document: a 128 bit hash of its text, the options that change its counters
+        and the version of the library (so that an upgrade never returns results of an older version).
+        A text that is not a str (which ReadCalc scores as an empty text) is hashed by its type and repr.
+    """
+    h = blake2b(digest_size=16)
+    h.update(repr((__version__, language, preprocesshtml, bool(forcePeriod), tokenizer)).encode("utf-8"))
+    if isinstance(text, str):
+        h.update(b"\0")
+        h.update(text.encode("utf-8", "surrogatepass"))
+    else:
+        h.update(b"\1")
+        h.update(("%s:%r" % (type(text).__name__, text)).encode("utf-8", "surrogatepass"))
+    return h.digest()
+
+
+class ResultCache:
+
+    def __init__(self, max_entries=10000, path=None, max_disk_bytes=1 << 30):
+        """
+            ResultCache(max_entries=10000, path=None, max_disk_bytes=1GB).
+
+            Remembers the counters (a ReadabilityCounts) of the documents already scored, so that a document
+            seen before costs one hash and one lookup instead of preprocessing, tokenization and syllables.
+            Use it with ReadCalc(text, cache=cache), score_many(texts, cache=cache) or AsyncScorer(cache=cache).
+
+            max_entries:
+              Number of documents kept in memory. The least recently used are dropped first.
+
+            path:
+              Optional sqlite file with a second, persistent tier shared between runs and processes.
+              Documents missing in memory are looked up there, and every new result is stored there too.
+
+            max_disk_bytes:
+              Maximum size of the (compressed) results in the sqlite file. When it is exceeded, the least
+              recently used documents are deleted until 90% of it is used.
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+
+        self.__lock = threading.Lock()
+        self.__memory = OrderedDict()
+        self.__db = None
+        self.__disk_bytes = 0
+        if path is not None:
+            self.__open(path)
+        self.reset_stats()
+
+    def __repr__(self):
+        return "ResultCache(entries=%d, path=%r, hits=%d, disk_hits=%d, misses=%d)" %\
+                (len(self.__memory), self.path, self.hits, self.disk_hits, self.misses)
+
+    def __len__(self):
+        return len(self.__memory)
+
+    def __open(self, path):
+        import sqlite3
+        self.__db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute("PRAGMA synchronous=NORMAL")
+        self.__db.execute("CREATE TABLE IF NOT EXISTS results "
+                          "(key BLOB PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)")
+        self.__db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self.__disk_bytes = self.__db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def reset_stats(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def get(self, key):
+        """
+            Returns the ReadabilityCounts stored for the key (see make_key), or None.
+            The counts are shared with the cache and must not be modified.
+        """
+        with self.__lock:
+            counts = self.__memory.get(key)
+            if counts is not None:
+                self.__memory.move_to_end(key)
+                self.hits += 1
+                return counts
+
+            if self.__db is not None:
+                row = self.__db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self.__db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                    counts = ReadabilityCounts.from_dict(json.loads(zlib.decompress(row[0]).decode("utf-8")))
+                    self.__remember(key, counts)
+                    self.disk_hits += 1
+                    return counts
+
+            self.misses += 1
+            return None
+
+    def put(self, key, counts):
+        """
+            Stores the ReadabilityCounts of the key in memory and, if the cache has a path, on disk.
+        """
+        with self.__lock:
+            self.__remember(key, counts)
+            self.stores += 1
+            if self.__db is not None:
+                value = zlib.compress(json.dumps(counts.to_dict(), separators=(",", ":")).encode("utf-8"))
+                old = self.__db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                self.__db.execute("INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                                  (key, value, len(value), time.time()))
+                self.__disk_bytes += len(value) - (old[0] if old else 0)
+                if self.__disk_bytes > self.max_disk_bytes:
+                    self.__evict_disk()
+
+    def __remember(self, key, counts):
+        self.__memory[key] = counts
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.max_entries:
+            self.__memory.popitem(last=False)
+            self.evictions += 1
+
+    def __evict_disk(self):
+        target = self.max_disk_bytes * 0.9
+        while self.__disk_bytes > target:
+            rows = self.__db.execute("SELECT key, size FROM results ORDER BY accessed LIMIT 256").fetchall()
+            if not rows:
+                self.__disk_bytes = 0
+                break
+            for key, size in rows:
+                self.__db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.__disk_bytes -= size
+                self.disk_evictions += 1
+                if self.__disk_bytes <= target:
+                    break
+
+    def clear(self):
+        """
+            Removes every document from both tiers.
+        """
+        with self.__lock:
+            self.__memory.clear()
+            if self.__db is not None:
+                self.__db.execute("DELETE FROM results")
+                self.__disk_bytes = 0
+
+    def close(self):
+        with self.__lock:
+            if self.__db is not None:
+                self.__db.close()
+                self.__db = None
+
+    def get_hit_rate(self):
+        total = self.hits + self.disk_hits + self.misses
+        if total == 0:
+            return 0.0
+        return (self.hits + self.disk_hits) / total
+
+    def summary(self):
+        """
+            Returns a dictionary with the size of each tier and the hit statistics.
+        """
+        return {
+            "entries": len(self.__memory),
+            "max_entries": self.max_entries,
+            "disk_bytes": self.__disk_bytes,
+            "max_disk_bytes": self.max_disk_bytes if self.path is not None else 0,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.get_hit_rate(),
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+        }
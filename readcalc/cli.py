@@ -0,0 +1,404 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+    readcalc [options] INPUT [INPUT ...]
+
+    Scores every document of the inputs in parallel and writes one record per document (its id and the
+    fields of ReadCalc.get_all_metrics()) as JSONL, CSV or Parquet.
+
+    Inputs can be files or directories ("-" is the standard input). Files ending in .gz are decompressed.
+    Their format is chosen by --format, or by their extension if it is "auto":
+
+      - .jsonl, .ndjson          ---- One JSON object per line, the text is in --text-field.
+      - .csv, .tsv               ---- A table with a header, the text is in the column --text-field.
+      - directories              ---- Every file (matching --pattern) is a document.
+      - anything else            ---- Plain text, split into documents on --delimiter (default: a line break).
+                                      Uncompressed files are memory mapped.
+
+    The input is read, scored and written in chunks, so the memory used does not depend on its size.
+"""
+
+import argparse
+import codecs
+import csv
+import fnmatch
+import gzip
+import io
+import json
+import mmap
+import os
+import sys
+import textwrap
+import time
+from collections import deque
+
+from .batch import METRIC_NAMES, score_many
+from .cache import ResultCache
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+READ_SIZE = 1 << 20
+
+
+def _open_text(path, encoding):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding=encoding, errors="replace", newline="")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding=encoding, errors="replace", newline="")
+    return open(path, encoding=encoding, errors="replace", newline="")
+
+
+def _base_name(path):
+    return path[:-3] if path.endswith(".gz") else path
+
+
+def get_format(path):
+    """
+        Returns the input format of a path from its extension: jsonl, csv, tsv, files (directories) or text.
+    """
+    if path != "-" and os.path.isdir(path):
+        return "files"
+    extension = os.path.splitext(_base_name(path))[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension in (".csv", ".tsv"):
+        return extension[1:]
+    return "text"
+
+
+def _skip(path, number, reason, errors):
+    if errors is not None:
+        errors.write("%s:%d: skipped, %s\n" % (path, number, reason))
+
+
+def iter_jsonl(path, text_field="text", id_field=None, encoding="utf-8", errors=sys.stderr):
+    """
+        Yields (id, text) for each line of a JSONL file. The id is id_field or "path:line number".
+        Lines that are not a JSON object with a string in text_field (and a value in id_field) are skipped
+        and reported on errors (a file, None to skip them silently).
+    """
+    with _open_text(path, encoding) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                _skip(path, number, "invalid JSON (%s)" % (e), errors)
+                continue
+            if not isinstance(record, dict):
+                _skip(path, number, "not a JSON object", errors)
+                continue
+            text = record.get(text_field)
+            if not isinstance(text, str):
+                _skip(path, number, "field %r is not a string" % (text_field), errors)
+                continue
+            if id_field and record.get(id_field) is None:
+                _skip(path, number, "no field %r" % (id_field), errors)
+                continue
+            yield record[id_field] if id_field else "%s:%d" % (path, number), text
+
+
+def iter_csv(path, text_field="text", id_field=None, delimiter=",", encoding="utf-8", errors=sys.stderr):
+    """
+        Yields (id, text) for each row of a CSV file with a header. The id is id_field or "path:row number".
+        Rows too short to have the text (or id) column are skipped and reported on errors (a file, None to skip them
+        silently).
+    """
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with _open_text(path, encoding) as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        for field in (text_field, id_field):
+            if field and field not in (reader.fieldnames or []):
+                raise ValueError("%s has no column %r" % (path, field))
+        for number, row in enumerate(reader, 1):
+            missing = [field for field in (text_field, id_field) if field and row[field] is None]
+            if missing:
+                _skip(path, number, "no value in column %r" % (missing[0]), errors)
+                continue
+            yield row[id_field] if id_field else "%s:%d" % (path, number), row[text_field]
+
+
+def iter_files(path, pattern="*", encoding="utf-8"):
+    """
+        Yields (relative path, text) for each file of a directory (recursively, in sorted order) whose name
+        matches the pattern.
+    """
+    for root, directories, files in os.walk(path):
+        directories.sort()
+        for name in sorted(files):
+            if not fnmatch.fnmatch(name, pattern):
+                continue
+            full_path = os.path.join(root, name)
+            with _open_text(full_path, encoding) as f:
+                yield os.path.relpath(full_path, path), f.read()
+
+
+def _split_stream(f, delimiter):
+    buffered = b""
+    for block in iter(lambda: f.read(READ_SIZE), b""):
+        buffered += block
+        pieces = buffered.split(delimiter)
+        buffered = pieces.pop()
+        for piece in pieces:
+            yield piece
+    yield buffered
+
+
+def _split_file(path, delimiter):
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            for piece in _split_stream(f, delimiter):
+                yield piece
+        return
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            start = 0
+            while start <= len(m):
+                end = m.find(delimiter, start)
+                if end == -1:
+                    end = len(m)
+                yield m[start:end]
+                start = end + len(delimiter)
+
+
+def iter_delimited(path, delimiter="\n", encoding="utf-8"):
+    """
+        Yields (id, text) for each non empty piece of a text file split on the delimiter.
+        The id is "path:n" for the n-th piece. Uncompressed files are memory mapped instead of read.
+    """
+    separator = delimiter.encode(encoding)
+    pieces = _split_stream(sys.stdin.buffer, separator) if path == "-" else _split_file(path, separator)
+
+    number = 0
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        number += 1
+        yield "%s:%d" % (path, number), piece.decode(encoding, "replace")
+
+
+def iter_documents(paths, input_format="auto", text_field="text", id_field=None, delimiter="\n", pattern="*",
+                   encoding="utf-8"):
+    """
+        Yields (id, text) for every document of the inputs (see the help of the command for the formats).
+    """
+    for path in paths:
+        current = get_format(path) if input_format == "auto" else input_format
+        if current == "jsonl":
+            documents = iter_jsonl(path, text_field, id_field, encoding)
+        elif current in ("csv", "tsv"):
+            tsv = current == "tsv" or (input_format == "csv" and _base_name(path).lower().endswith(".tsv"))
+            documents = iter_csv(path, text_field, id_field, "\t" if tsv else ",", encoding)
+        elif current == "files":
+            documents = iter_files(path, pattern, encoding)
+        elif current == "text":
+            documents = iter_delimited(path, delimiter, encoding)
+        else:
+            raise ValueError("Unknown input format %r" % (current))
+        for document in documents:
+            yield document
+
+
+class JSONLWriter:
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, rows):
+        self.f.write("".join(json.dumps(dict(zip(("id",) + METRIC_NAMES, row))) + "\n" for row in rows))
+
+    def close(self):
+        if self.f is sys.stdout:
+            self.f.flush()
+        else:
+            self.f.close()
+
+
+class CSVWriter:
+
+    def __init__(self, f):
+        self.f = f
+        self.writer = csv.writer(f)
+        self.writer.writerow(("id",) + METRIC_NAMES)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        if self.f is sys.stdout:
+            self.f.flush()
+        else:
+            self.f.close()
+
+
+class ParquetWriter:
+
+    def __init__(self, path):
+        """
+            Writes each chunk of rows as a row group of a Parquet file (pyarrow must be installed).
+        """
+        import pyarrow
+        import pyarrow.parquet
+        self.pyarrow = pyarrow
+        fields = [pyarrow.field("id", pyarrow.string())]
+        for name in METRIC_NAMES:
+            fields.append(pyarrow.field(name, pyarrow.float64() if name in METRIC_NAMES[11:] else pyarrow.int64()))
+        self.schema = pyarrow.schema(fields)
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        columns[0] = [str(document_id) for document_id in columns[0]]
+        self.writer.write_table(self.pyarrow.Table.from_arrays([self.pyarrow.array(column, type=field.type)
+                                                                for column, field in zip(columns, self.schema)],
+                                                               schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def get_output_format(path):
+    base = _base_name(path).lower()
+    if base.endswith(".csv"):
+        return "csv"
+    if base.endswith(".parquet"):
+        return "parquet"
+    return "jsonl"
+
+
+def open_writer(path, output_format):
+    """
+        Returns a writer with write(rows) and close(). path "-" is the standard output; paths ending in .gz
+        are compressed (except Parquet files, which are compressed by pyarrow).
+    """
+    if output_format == "parquet":
+        if path == "-":
+            raise ValueError("Parquet output needs a file (--output)")
+        return ParquetWriter(path)
+    if path == "-":
+        f = sys.stdout
+    elif path.endswith(".gz"):
+        f = gzip.open(path, "wt", encoding="utf-8", newline="")
+    else:
+        f = open(path, "w", encoding="utf-8", newline="")
+    return CSVWriter(f) if output_format == "csv" else JSONLWriter(f)
+
+
+class Progress:
+
+    def __init__(self, interval=2.0, out=sys.stderr):
+        """
+            Prints the number of documents, their size and the throughput every interval seconds
+            (never if interval is None).
+        """
+        self.interval = interval
+        self.out = out
+        self.documents = 0
+        self.chars = 0
+        self.start = self.last = time.time()
+
+    def read(self, text):
+        self.chars += len(text)
+
+    def scored(self, documents):
+        self.documents += documents
+        if self.interval is not None and time.time() - self.last >= self.interval:
+            self.last = time.time()
+            self.report("\r")
+
+    def report(self, end="\n"):
+        elapsed = max(time.time() - self.start, 1e-9)
+        self.out.write("%d documents, %.1f MB in %.1fs: %.1f docs/s, %.2f MB/s%s" %
+                       (self.documents, self.chars / 1e6, elapsed, self.documents / elapsed,
+                        self.chars / 1e6 / elapsed, end))
+        self.out.flush()
+
+
+def run(documents, writer, progress, chunk_rows=10000, **options):
+    """
+        Scores (id, text) pairs with score_many(**options) and gives the rows (id, metrics...) to the writer
+        in chunks of chunk_rows. Returns the number of documents.
+    """
+    ids = deque()
+
+    def texts():
+        for document_id, text in documents:
+            ids.append(document_id)
+            progress.read(text)
+            yield text
+
+    rows = []
+    for metrics in score_many(texts(), **options):
+        rows.append((ids.popleft(),) + tuple(metrics))
+        if len(rows) >= chunk_rows:
+            writer.write(rows)
+            progress.scored(len(rows))
+            rows = []
+    if rows:
+        writer.write(rows)
+        progress.scored(len(rows))
+    return progress.documents
+
+
+def main(argv=None):
+    paragraphs = textwrap.dedent(__doc__).strip().split("\n\n")
+    parser = argparse.ArgumentParser(prog="readcalc", description=paragraphs[1], epilog="\n\n".join(paragraphs[2:]),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", metavar="INPUT", help="files or directories, - for the standard input")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: standard output)")
+    parser.add_argument("--output-format", choices=("jsonl", "csv", "parquet"),
+                        help="default: from the extension of --output, else jsonl")
+    parser.add_argument("--format", default="auto", choices=("auto", "jsonl", "csv", "tsv", "files", "text"),
+                        help="input format (default: from the extension of each input)")
+    parser.add_argument("--text-field", default="text", help="JSON field or CSV column with the text")
+    parser.add_argument("--id-field", default=None, help="JSON field or CSV column with the id of the document")
+    parser.add_argument("--delimiter", default="\\n",
+                        help="separator of the documents of plain text files, with backslash escapes "
+                             "(default: \\n, e.g. \\n\\n for paragraphs)")
+    parser.add_argument("--pattern", default="*", help="names of the files read in directories (default: *)")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: number of cores)")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--preprocess", default=None, choices=("fast", "justext", "bs4"),
+                        help="HTML preprocessing (default: none)")
+    parser.add_argument("--force-period", action="store_true", help="see forcePeriod in ReadCalc")
+    parser.add_argument("--tokenizer", default="nltk", choices=("nltk", "fast"))
+    parser.add_argument("--chunksize", type=int, default=64, help="documents sent to a worker at once")
+    parser.add_argument("--chunk-rows", type=int, default=10000, help="rows written at once")
+    parser.add_argument("--cache", default=None, metavar="PATH", help="sqlite file with a persistent result cache")
+    parser.add_argument("--progress", type=float, default=2.0, metavar="SECONDS",
+                        help="seconds between progress reports on stderr (default: 2, 0 disables them)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress nor summary")
+    args = parser.parse_args(argv)
+
+    delimiter = codecs.decode(args.delimiter.encode("latin-1", "backslashreplace"), "unicode_escape")
+    if not delimiter:
+        parser.error("--delimiter cannot be empty")
+
+    interval = args.progress if args.progress > 0 and not args.quiet else None
+    progress = Progress(interval)
+    cache = ResultCache(path=args.cache) if args.cache else None
+    writer = open_writer(args.output, args.output_format or get_output_format(args.output))
+    documents = iter_documents(args.inputs, args.format, args.text_field, args.id_field, delimiter, args.pattern,
+                               args.encoding)
+    try:
+        run(documents, writer, progress, args.chunk_rows, workers=args.workers, chunksize=args.chunksize,
+            language=args.language, preprocesshtml=args.preprocess, forcePeriod=args.force_period,
+            tokenizer=args.tokenizer, cache=cache)
+    finally:
+        writer.close()
+        if cache is not None:
+            cache.close()
+    if not args.quiet:
+        progress.report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
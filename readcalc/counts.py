@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from __future__ import division
+import base64
+import hashlib
+import math
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+
+class HyperLogLog:
+
+    def __init__(self, precision=12):
+        """
+            HyperLogLog(precision=12).
+
+            Approximate set of words. It only supports add() and len(), but takes a fixed amount of memory
+            (2 ** precision bytes) and can be merged across documents or machines.
+            The standard error of len() is about 1.04 / sqrt(2 ** precision), i.e., 1.6% for the default.
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16, got %s" % (precision))
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def __repr__(self):
+        return "HyperLogLog(precision=%d, ~%d words)" % (self.precision, len(self))
+
+    def __eq__(self, other):
+        return isinstance(other, HyperLogLog) and self.precision == other.precision and\
+                self.registers == other.registers
+
+    def copy(self):
+        other = HyperLogLog(self.precision)
+        other.registers = bytearray(self.registers)
+        return other
+
+    def add(self, word):
+        # A stable hash, so that sketches built in different processes can be merged.
+        h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+        bits = 64 - self.precision
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, other):
+        """
+            Adds all words of other, which can be a HyperLogLog of the same precision or any iterable of words.
+        """
+        if isinstance(other, HyperLogLog):
+            if other.precision != self.precision:
+                raise ValueError("Cannot merge HyperLogLog with precisions %d and %d" %
+                                 (self.precision, other.precision))
+            self.registers = bytearray(map(max, self.registers, other.registers))
+        else:
+            for word in other:
+                self.add(word)
+
+    def __len__(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction (linear counting).
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class ReadabilityCounts:
+
+    fields = ("chars", "words", "sentences", "syllables", "polysyllable_words", "difficult_words")
+
+    def __init__(self, chars=0, words=0, sentences=0, syllables=0, polysyllable_words=0, difficult_words=0,
+                 word_lengths=None, types=None):
+        """
+            ReadabilityCounts(chars=0, words=0, sentences=0, syllables=0, polysyllable_words=0, difficult_words=0,
+                              word_lengths=None, types=None).
+
+            All the counters that the readability formulas are computed from. Counts of different pieces of text
+            can be added together (counts_a + counts_b, or ReadabilityCounts.merge_all(list_of_counts)), so that
+            partial results computed by different workers or machines give the same scores as the whole text.
+            Use ReadCalc.get_counts() to get them and ReadCalc.from_counts() to compute the indices.
+
+            word_lengths:
+              Dictionary {word length: number of words}.
+
+            types:
+              The unique words. Either a set (exact) or a HyperLogLog (approximate, fixed size).
+        """
+        self.chars = chars
+        self.words = words
+        self.sentences = sentences
+        self.syllables = syllables
+        self.polysyllable_words = polysyllable_words
+        self.difficult_words = difficult_words
+        self.word_lengths = {} if word_lengths is None else word_lengths
+        self.types = set() if types is None else types
+
+    def __repr__(self):
+        return "ReadabilityCounts(%s, types=%d)" %\
+                (", ".join("%s=%d" % (field, getattr(self, field)) for field in self.fields), self.number_types)
+
+    def __eq__(self, other):
+        return isinstance(other, ReadabilityCounts) and self.to_dict() == other.to_dict()
+
+    @property
+    def number_types(self):
+        return len(self.types)
+
+    def copy(self):
+        """
+            Returns a copy that can be merged into without changing these counts.
+        """
+        return ReadabilityCounts(word_lengths=dict(self.word_lengths), types=self.types.copy(),
+                                 **dict((field, getattr(self, field)) for field in self.fields))
+
+    @classmethod
+    def merge_all(cls, counts):
+        """
+            Returns the sum of an iterable of counts, merged in place into a single new object.
+            Prefer it to sum(), which copies the partial sum at every step.
+        """
+        total = cls()
+        for other in counts:
+            total.merge(other)
+        return total
+
+    def merge(self, other):
+        """
+            Adds the counts of other to these counts. Returns self.
+            Merging exact types with approximate ones gives approximate types.
+        """
+        for field in self.fields:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+        for size, number in other.word_lengths.items():
+            self.word_lengths[size] = self.word_lengths.get(size, 0) + number
+
+        if isinstance(self.types, set) and isinstance(other.types, HyperLogLog):
+            types = HyperLogLog(other.types.precision)
+            types.update(self.types)
+            self.types = types
+        self.types.update(other.types)
+        return self
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def __radd__(self, other):
+        # Allows sum(list_of_counts)
+        if other == 0:
+            return self.copy()
+        return NotImplemented
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def to_dict(self):
+        """
+            Returns a dictionary that can be serialized to JSON.
+        """
+        ret = dict((field, getattr(self, field)) for field in self.fields)
+        ret["word_lengths"] = dict((str(size), number) for size, number in self.word_lengths.items())
+        if isinstance(self.types, HyperLogLog):
+            ret["types"] = {"precision": self.types.precision,
+                            "registers": base64.b64encode(bytes(self.types.registers)).decode("ascii")}
+        else:
+            ret["types"] = sorted(self.types)
+        return ret
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+            Inverse of to_dict().
+        """
+        types = data.get("types", [])
+        if isinstance(types, dict):
+            hll = HyperLogLog(types["precision"])
+            hll.registers = bytearray(base64.b64decode(types["registers"]))
+            types = hll
+        else:
+            types = set(types)
+        word_lengths = dict((int(size), number) for size, number in data.get("word_lengths", {}).items())
+        return cls(word_lengths=word_lengths, types=types, **dict((field, data.get(field, 0)) for field in cls.fields))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+    Pure Python sentence and word segmentation, used by ReadCalc(text, tokenizer="fast").
+
+    It needs neither NLTK nor the punkt model. For common English prose it gives the same words as
+    the Treebank tokenizer followed by the removal of punctuation, and almost the same sentences as punkt
+    (python -m readcalc.bench reports the divergence on its corpora).
+"""
+
+import re
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+# Chars and sequences that the Treebank tokenizer turns into separate (punctuation) tokens.
+_separator = re.compile(r"[\s;@#$%&?!()\[\]{}<>\"]+|--|\.\.\.|[,:](?!\d)")
+_contraction = re.compile(r"(?i)(?<=[^'])('s|'m|'d|'ll|'re|'ve|n't)$")
+_non_word = re.compile(r"\W")
+_non_space = re.compile(r"\S")
+# The period that the Treebank tokenizer splits off at the very end of a text.
+_final_period = re.compile(r"[^.](\.)[\])}>\"']*\s*$")
+
+# Words the Treebank tokenizer splits in two.
+_split_words = {
+    "cannot": ("can", "not"),
+    "d'ye": ("d", "ye"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "more'n": ("more", "n"),
+    "wanna": ("wan", "na"),
+    "'tis": ("t", "is"),
+    "'twas": ("t", "was"),
+}
+
+_sentence_end = re.compile(r"[.!?]+['\"’”)\]]*(?=\s|$)")
+_last_word = re.compile(r"\S*$")
+_acronym = re.compile(r"(?:[^\W\d_]\.)+[^\W\d_]$")
+
+# Abbreviations that are (almost) never at the end of a sentence.
+ABBREVIATIONS = frozenset(["mr", "mrs", "ms", "dr", "prof", "st", "mt", "vs", "fig", "vol", "capt", "lt", "sgt", "rev",
+                           "hon", "approx", "cf"])
+
+# Abbreviations that can also end a sentence (or are also words): they only do it before a capital letter.
+# "no" is only an abbreviation before a number (No. 5).
+AMBIGUOUS_ABBREVIATIONS = frozenset(["sr", "jr", "etc", "inc", "ltd", "co", "corp", "gen", "col", "jan", "feb", "mar",
+                                     "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "dept", "est",
+                                     "govt", "al", "ca"])
+
+
+def _is_abbreviation(text, end, following):
+    """
+        True if the period at text[end] closes an abbreviation (Mr.), an initial (J.) or an acronym (U.S.).
+        following is the first char after the period and the spaces.
+    """
+    word = _last_word.search(text, max(0, end - 32), end).group().lstrip("\"'([{‘“").lower()
+    if word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()) or _acronym.match(word):
+        return True
+    if word in AMBIGUOUS_ABBREVIATIONS:
+        return not following.isupper()
+    return word == "no" and following.isdigit()
+
+
+def iter_sentences(text):
+    """
+        Yields the sentences of the text.
+    """
+    start = 0
+    for match in _sentence_end.finditer(text):
+        marks = match.group()
+        following = _non_space.search(text, match.end())
+        if following is None:
+            break
+
+        if "?" not in marks and "!" not in marks:
+            if marks.startswith(".."):
+                # Ellipsis: only ends the sentence before a capital letter.
+                if not following.group().isupper():
+                    continue
+            elif _is_abbreviation(text, match.start(), following.group()):
+                continue
+
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            yield sentence
+        start = match.end()
+
+    sentence = text[start:].strip()
+    if sentence:
+        yield sentence
+
+
+def sent_tokenize(text):
+    """
+        Returns a list with the sentences of the text, like nltk.tokenize.sent_tokenize.
+    """
+    return list(iter_sentences(text))
+
+
+def _iter_pieces(text):
+    start = 0
+    for match in _separator.finditer(text):
+        if match.start() > start:
+            yield text[start:match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+
+def iter_words(text, final=True):
+    """
+        Yields the lowercased words of the text, without punctuation.
+        Use final=False when more text follows (see readcalc.readcalc._iter_words): only the period at the end
+        of the whole text is separated from its word, which matters for contractions (<<he'd.>>).
+    """
+    if final:
+        match = _final_period.search(text, max(0, len(text.rstrip()) - 16))
+        if match:
+            text = text[:match.start(1)] + " " + text[match.end(1):]
+    for piece in _iter_pieces(text):
+        piece = piece.lower()
+        parts = _split_words.get(piece)
+        if parts is None:
+            if piece.isalnum():
+                yield piece
+                continue
+            match = _contraction.search(piece)
+            parts = (piece[:match.start()], match.group()) if match else (piece,)
+
+        for part in parts:
+            word = _non_word.sub("", part)
+            if word:
+                yield word
@@ -1,24 +1,135 @@
 # To clean html
-import justext
-from bs4 import BeautifulSoup
+import logging
+import threading
+from html.parser import HTMLParser
+
+# justext and bs4 are only imported when they are used.
 # from boilerpipe.extract import Extractor # Boilerpipe is not currently being mantained. Removed till it comes back to live.
 
+# Tags whose content is never text. <head> is also skipped, until it is closed explicitly or implicitly.
+SKIP_TAGS = frozenset(["script", "style", "noscript", "template", "svg"])
+
+# Tags that start or end a block of text.
+BLOCK_TAGS = frozenset(["address", "article", "aside", "blockquote", "body", "br", "caption", "dd", "div", "dl",
+                        "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5",
+                        "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "td",
+                        "th", "title", "tr", "ul"])
+
+_stoplists = {}
+_parsers = threading.local()
+_logger = logging.getLogger(__name__)
+
+
+class FastHTMLStripper(HTMLParser):
+    """
+        Streaming tag stripper. No tree is built: text is collected as the parser goes, the content of
+        script/style-like tags is dropped and a line break (or a period and a line break, if forcePeriod)
+        is added at the boundaries of block tags.
+    """
+
+    def __init__(self):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.forcePeriod = False
+        self.__skip = 0
+        self.__head = False
+        self.__blocks = []
+        self.__block = []
+
+    def reset(self):
+        HTMLParser.reset(self)
+        self.__skip = 0
+        self.__head = False
+        self.__blocks = []
+        self.__block = []
+
+    def __end_block(self):
+        text = " ".join("".join(self.__block).split())
+        if text:
+            self.__blocks.append(text + "." if self.forcePeriod else text)
+        self.__block = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.__skip += 1
+        elif tag == "head":
+            self.__head = True
+        elif tag == "body":
+            # Unclosed <head>
+            self.__skip = 0
+            self.__head = False
+        elif tag in BLOCK_TAGS and tag != "title":
+            # As in browsers, content that cannot be in <head> closes it
+            self.__head = False
+        if tag in BLOCK_TAGS:
+            self.__end_block()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.__end_block()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.__skip = max(0, self.__skip - 1)
+        elif tag == "head":
+            self.__head = False
+        if tag in BLOCK_TAGS:
+            self.__end_block()
+
+    def handle_data(self, data):
+        if not self.__skip and not self.__head:
+            self.__block.append(data)
+
+    def get_text(self):
+        self.__end_block()
+        return "\n".join(self.__blocks)
+
+
+def _get_stoplist(language="English"):
+    stoplist = _stoplists.get(language)
+    if stoplist is None:
+        import justext
+        stoplist = _stoplists[language] = justext.get_stoplist(language)
+    return stoplist
+
+
+def fast_strip_html(text, forcePeriod=False):
+    """
+        Removes html tags with a FastHTMLStripper. One parser is created per thread and reused.
+    """
+    parser = getattr(_parsers, "fast", None)
+    if parser is None:
+        parser = _parsers.fast = FastHTMLStripper()
+    parser.reset()
+    parser.forcePeriod = forcePeriod
+    try:
+        parser.feed(text)
+        parser.close()
+        return parser.get_text()
+    finally:
+        parser.reset()
+
 
 def preprocess_html(text, preprocessor, forcePeriod):
     """
         Options:
-        preprocessor: justext, bs4, None
+        preprocessor: fast, justext, bs4, None
         continuous: True, False.
 
         Use continuous to set if you want to force end of sentences.
     """
 
-    if not preprocessor or not (type(text) == str or type(text) == unicode) or len(text.strip()) == 0:
-        print("TEXT IS NOT BEING PRE PROCESSED")
-        print("type(text) == %s ; Size Text: %d" % (type(text), len(text.strip())))
+    if not isinstance(text, str):
+        raise TypeError("text must be a str, not %s" % (type(text).__name__))
+
+    if not preprocessor or len(text.strip()) == 0:
+        _logger.debug("Text is not being preprocessed (preprocessor=%s, size text: %d)", preprocessor, len(text))
         return text
 
+    elif preprocessor == "fast":
+        return fast_strip_html(text, forcePeriod)
+
     elif preprocessor == "bs4":
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(text, "html.parser")
         tags_to_remove = ["script"]
         for tag in tags_to_remove:
@@ -30,7 +141,8 @@ def preprocess_html(text, preprocessor, forcePeriod):
             return soup.body.get_text()
 
     elif preprocessor == "justext":
-        paragraphs = justext.justext(text, justext.get_stoplist('English'))
+        import justext
+        paragraphs = justext.justext(text, _get_stoplist('English'))
         text = "\n"
         for paragraph in paragraphs:
             if not paragraph.is_boilerplate: # and not paragraph.is_header:
@@ -51,7 +163,7 @@ def preprocess_html(text, preprocessor, forcePeriod):
             return text
 
     else:
-        print("PRE PROCESSING OPTION %s NOT FOUND. IGNORING PRE PROCESSING." % (preprocessor))
+        _logger.warning("Pre processing option %s not found. Ignoring pre processing.", preprocessor)
         return text
 
 
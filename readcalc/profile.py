@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import logging
+import re
+from array import array
+
+from .readcalc import ReadCalc, _get_tokenizer, _word_char
+from .counts import ReadabilityCounts
+from .preprocessing import preprocess_html
+from .syllables import get_syllable_counter
+from .dalechallwords import get_dale_chall_words
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+_logger = logging.getLogger(__name__)
+
+# Counters kept for each sentence, named as in ReadCalc.get_internal_metrics()
+COUNTERS = ("number_chars", "number_words", "number_syllables", "number_polysyllable_words", "difficult_words",
+            "number_words_longer_4", "number_words_longer_6", "number_words_longer_10", "number_words_longer_13")
+
+
+class ReadabilityProfile:
+
+    def __init__(self, text, language="en", preprocesshtml=None, forcePeriod=False, tokenizer="nltk",
+                 paragraph_separator=None):
+        """
+            ReadabilityProfile(text, language="en", preprocesshtml=None, forcePeriod=False, tokenizer="nltk",
+                               paragraph_separator=None).
+
+            Readability of any part of a document: a paragraph, a range of sentences or a sliding window.
+            The text is tokenized, hyphenated and looked up in the Dale-Chall list once. The counters of
+            each sentence are kept as prefix sums in compact arrays, so that the counters (and indices) of any
+            range of sentences are computed in constant time.
+
+            language, preprocesshtml, forcePeriod, tokenizer:
+              Same as in ReadCalc.
+
+            paragraph_separator:
+              Regular expression that separates paragraphs. Sentences never cross it.
+              Default is an empty line, or a line break if preprocesshtml is used.
+        """
+        self.language = language
+        self.tokenizer = tokenizer
+        tokenize_sentences, tokenize_words = _get_tokenizer(tokenizer)
+        try:
+            text = preprocess_html(text, preprocesshtml, forcePeriod)
+        except Exception as e:
+            _logger.warning("Error %s -- %s. The text is scored as empty.", type(e).__name__, e)
+            text = ""
+        if paragraph_separator is None:
+            paragraph_separator = r"\n" if preprocesshtml else r"\n\s*\n"
+
+        count_syllables = get_syllable_counter(language).count
+        dale_chall_words = get_dale_chall_words()
+
+        self.sentences = []
+        self.paragraph_starts = array("l")
+        self.__sums = dict((name, array("q", [0])) for name in COUNTERS)
+        appends = [self.__sums[name].append for name in COUNTERS]
+        totals = [0] * len(COUNTERS)
+
+        for paragraph in re.split(paragraph_separator, text):
+            sentences = [sentence for sentence in tokenize_sentences(paragraph) if _word_char.search(sentence)]
+            if sentences:
+                self.paragraph_starts.append(len(self.sentences))
+                self.sentences.extend(sentences)
+
+        last = len(self.sentences) - 1
+        for i, sentence in enumerate(self.sentences):
+            # Words are split as if the whole text was tokenized at once (see readcalc._tokenize)
+            for word in tokenize_words(sentence, i == last):
+                size = len(word)
+                syl = count_syllables(word)
+                totals[0] += size
+                totals[1] += 1
+                totals[2] += syl
+                if syl >= 3:
+                    totals[3] += 1
+                if word not in dale_chall_words:
+                    totals[4] += 1
+                if size > 4:
+                    totals[5] += 1
+                    if size > 6:
+                        totals[6] += 1
+                        if size > 10:
+                            totals[7] += 1
+                            if size > 13:
+                                totals[8] += 1
+
+            for append, total in zip(appends, totals):
+                append(total)
+
+    def __repr__(self):
+        return "ReadabilityProfile(sentences=%d, paragraphs=%d, words=%d)" %\
+                (len(self.sentences), len(self.paragraph_starts), self.__sums["number_words"][-1])
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __range(self, start, end):
+        n = len(self.sentences)
+        if end is None:
+            end = n
+        if start < 0:
+            start += n
+        if end < 0:
+            end += n
+        if not 0 <= start <= end <= n:
+            raise IndexError("Invalid range of sentences [%d, %d) for %d sentences" % (start, end, n))
+        return start, end
+
+    def get_counts(self, start=0, end=None):
+        """
+            Returns a dictionary with the counters (see COUNTERS) and number_sentences of the sentences
+            [start, end), like Python slices. Default is the whole document.
+        """
+        start, end = self.__range(start, end)
+        counts = dict((name, sums[end] - sums[start]) for name, sums in self.__sums.items())
+        counts["number_sentences"] = end - start
+        return counts
+
+    def get_sentence_counts(self, i):
+        """
+            Returns the counters of the i-th sentence.
+        """
+        return self.get_counts(i, i + 1 if i != -1 else None)
+
+    def window(self, start=0, end=None):
+        """
+            Returns a ReadCalc (without text) with the counters of the sentences [start, end), on which every
+            get_*_index()/get_*_score() method can be called.
+            The number of unique words is not kept per sentence and is always 0.
+        """
+        c = self.get_counts(start, end)
+        words, longer_4, longer_6 = c["number_words"], c["number_words_longer_4"], c["number_words_longer_6"]
+        longer_10, longer_13 = c["number_words_longer_10"], c["number_words_longer_13"]
+        # A histogram of word lengths with the same number of words longer than 4, 6, 10 and 13 chars
+        word_lengths = {1: words - longer_4, 5: longer_4 - longer_6, 7: longer_6 - longer_10,
+                        11: longer_10 - longer_13, 14: longer_13}
+        counts = ReadabilityCounts(chars=c["number_chars"], words=words, sentences=c["number_sentences"],
+                                   syllables=c["number_syllables"], polysyllable_words=c["number_polysyllable_words"],
+                                   difficult_words=c["difficult_words"],
+                                   word_lengths=dict((size, n) for size, n in word_lengths.items() if n))
+        return ReadCalc.from_counts(counts, self.language, self.tokenizer)
+
+    def get_window_ranges(self, size, step=1):
+        """
+            Returns the list of (start, end) of the windows of size sentences, every step sentences.
+            A document shorter than size has one window with all its sentences.
+        """
+        n = len(self.sentences)
+        if size < 1 or step < 1:
+            raise ValueError("size and step must be positive")
+        if n == 0:
+            return []
+        return [(start, min(start + size, n)) for start in range(0, max(n - size, 0) + 1, step)]
+
+    def get_paragraph_ranges(self):
+        """
+            Returns the list of (start, end) of the sentences of each paragraph.
+        """
+        ends = list(self.paragraph_starts[1:]) + [len(self.sentences)]
+        return list(zip(self.paragraph_starts, ends))
+
+    def windows(self, size, step=1):
+        """
+            Yields (start, end, ReadCalc) for each window of size sentences (see get_window_ranges), e.g.:
+            max(profile.windows(5), key=lambda w: w[2].get_flesch_kincaid_grade_level())
+        """
+        for start, end in self.get_window_ranges(size, step):
+            yield start, end, self.window(start, end)
+
+    def paragraphs(self):
+        """
+            Yields (start, end, ReadCalc) for each paragraph.
+        """
+        for start, end in self.get_paragraph_ranges():
+            yield start, end, self.window(start, end)
+
+    def get_columns(self, ranges):
+        """
+            Returns a dictionary {counter: list with one value per range} for a list of (start, end), e.g.,
+            get_window_ranges(size). It can be given directly to vectorized.compute_indices(**columns)
+            to compute the indices of all windows at once.
+        """
+        columns = dict((name, [sums[end] - sums[start] for start, end in ranges])
+                       for name, sums in self.__sums.items())
+        columns["number_sentences"] = [end - start for start, end in ranges]
+        columns["start"] = [start for start, _ in ranges]
+        columns["end"] = [end for _, end in ranges]
+        return columns
@@ -2,27 +2,118 @@
 # encoding: utf-8
 
 from __future__ import division
+import logging
 import re
 import math
 import sys
-import bisect
+import copy
 
-from nltk import tokenize
 from .preprocessing import preprocess_html
 
-import pyphen
-
-from .dalechallwords import dale_chall_words
+from .syllables import get_syllable_counter
+from .counts import ReadabilityCounts, HyperLogLog
+from .cache import make_key
+from .stats import DocumentStats, get_stats
+from .dalechallwords import get_dale_chall_words
 '''
 Author: Joao Palotti <joaopalotti@gmail.com>
 '''
 
+_logger = logging.getLogger(__name__)
+
+_non_word = re.compile(r"\W")
+_word_char = re.compile(r"\w")
+_non_space = re.compile(r"\S")
+_word_tokenizer = None
+
+
+def _sent_tokenize(text):
+    """
+        NLTK's sent_tokenize. NLTK is only imported (and punkt loaded) the first time it is called.
+    """
+    from nltk import tokenize
+    return tokenize.sent_tokenize(text)
+
+
+def _get_word_tokenizer():
+    global _word_tokenizer
+    if _word_tokenizer is None:
+        from nltk.tokenize import TreebankWordTokenizer
+        _word_tokenizer = TreebankWordTokenizer()
+    return _word_tokenizer
+
+
+def _count_sentences(sentences):
+    """
+        Returns the number of sentences that are not made only of punctuation.
+    """
+    return sum(1 for sentence in sentences if _word_char.search(sentence))
+
+
+def _iter_blocks(text, size=65536):
+    """
+        Cuts the text into pieces of about size chars, always at the end of a line.
+        Yields pairs (piece, is_last_piece).
+    """
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + size)
+        if end == -1:
+            end = len(text)
+        last = not _non_space.search(text, end)
+        yield text[start:end], last
+        if last:
+            break
+        start = end + 1
+
+
+def _tokenize(text, final=True):
+    """
+        Treebank tokenization of a piece of text.
+        The Treebank tokenizer splits some tokens differently at the very end of a text (e.g. <<it's.>>).
+        If the piece is not the end of the text (final=False), a dummy token is added after it and removed
+        from the result, so that the tokens are the same as if the whole text had been tokenized at once.
+    """
+    if final:
+        return _get_word_tokenizer().tokenize(text)
+    return _get_word_tokenizer().tokenize(text + "\nx")[:-1]
+
+
+def _iter_words(text, final=True):
+    """
+        Yields the lowercased words of the text, without punctuation.
+        Ex.:  <<This is the final.>>  becomes
+        ['<','<', 'This', 'is', 'the', 'final', '.', '>', '>'] -> ['this', 'is', 'the', 'final']
+
+        The tokenizer runs over blocks of lines, so memory does not grow with the size of the text.
+        Use final=False when more text follows.
+    """
+    for block, last in _iter_blocks(text):
+        for token in _tokenize(block, final and last):
+            word = _non_word.sub("", token.strip().lower())
+            if word:
+                yield word
+
+
+def _get_tokenizer(name):
+    """
+        Returns the functions (sent_tokenize, iter_words) of a tokenizer: nltk or fast.
+    """
+    if name == "nltk":
+        return _sent_tokenize, _iter_words
+    if name == "fast":
+        from . import fasttokenize
+        return fasttokenize.sent_tokenize, fasttokenize.iter_words
+    raise ValueError("Unknown tokenizer %r. Options are nltk and fast." % (name))
+
 
 class ReadCalc:
 
-    def __init__(self, text, language="en", preprocesshtml=None, forcePeriod=False):
+    def __init__(self, text, language="en", preprocesshtml=None, forcePeriod=False, lazy=False, stats=None,
+                 tokenizer="nltk", cache=None):
         """
-            ReadCalc(text, preprocesshtml = None, language="en", forcePeriod = False).
+            ReadCalc(text, preprocesshtml = None, language="en", forcePeriod = False, lazy = False, stats = None,
+                     tokenizer = "nltk", cache = None).
 
             language:
               Used by the pyphen to break words into syllables.
@@ -35,6 +126,7 @@ class ReadCalc:
               The current available options are:
 
                 - None                  ---- Default, no preprocessing is made.
+                - fast                  ---- Fastest. Strips tags, scripts and styles without building a tree.
                 - justext               ---- Recommended to preprocess html.
                 - bs4 (beautifulsoup4)  ---- Watch out for encoding problems.
 
@@ -43,14 +135,180 @@ class ReadCalc:
               Options are False (default) and True.
               In case forcePeriod is active, a period mark will be added to every sentence
               extracted by the preprocessing html method employed.
+
+            lazy:
+              If False (default), all counters are computed when the object is created.
+              If True, each group of counters is only computed the first time a method needs it.
+              E.g., get_coleman_liau_index() and get_ari_index() never break words into syllables
+              nor look them up in the Dale-Chall list.
+
+            stats:
+              A stats.ReadCalcStats that records the time spent in each stage, counts, syllable cache hits and
+              preprocessing errors. Default is the one activated with stats.enable(), if any.
+              Without stats, no timing is done at all.
+
+            tokenizer:
+              Used to split the text into sentences and words.
+
+                - nltk                  ---- Default. NLTK's punkt and Treebank tokenizers.
+                - fast                  ---- Pure Python segmenter (readcalc.fasttokenize). Much faster and does not
+                                             need the punkt model. Gives (almost) the same counts for English prose.
+
+            cache:
+              A cache.ResultCache. If the same text was already scored with the same options, its counters are
+              taken from the cache and the text is only preprocessed if get_sentences() or get_words() are called.
+              Otherwise the counters are computed and stored in the cache (unless lazy is True).
+        """
+        self.language = language
+        self.tokenizer = tokenizer
+        self._tokenize_sentences, self._tokenize_words = _get_tokenizer(tokenizer)
+        if stats is None:
+            stats = get_stats()
+
+        key = None
+        if cache is not None:
+            key = make_key(text, language, preprocesshtml, forcePeriod, tokenizer)
+            counts = cache.get(key)
+            if counts is not None:
+                self.__source = (text, preprocesshtml, forcePeriod)
+                self._restore_counts(counts)
+                if stats is not None:
+                    document = DocumentStats()
+                    document.sentences = self.__number_sentences
+                    document.words = self.__number_words
+                    stats.add_document(document)
+                return
+
+        if stats is not None:
+            self.__init_with_stats(text, preprocesshtml, forcePeriod, lazy, stats)
+        else:
+            self.text = self.__preprocess(text, preprocesshtml, forcePeriod)
+            if not lazy:
+                self.analyse_text()
+
+        if key is not None and not lazy:
+            cache.put(key, self.get_counts())
+
+    @staticmethod
+    def __preprocess(text, preprocesshtml, forcePeriod, stats=None, document=None):
+        """
+            Returns the preprocessed text, or an empty text if preprocessing fails.
+            The error is logged and, with stats, recorded (the time spent is then counted as the preprocess stage).
         """
         try:
-            self.language = language
-            self.text = preprocess_html(text, preprocesshtml, forcePeriod)
+            if stats is None:
+                return preprocess_html(text, preprocesshtml, forcePeriod)
+            with stats.stage("preprocess", document):
+                return preprocess_html(text, preprocesshtml, forcePeriod)
         except Exception as e:
-            print(("Error %s -- %s" % (type(e), e)))
-            self.text = ""
-        self.analyse_text()
+            _logger.warning("Error %s -- %s. The text is scored as empty.", type(e).__name__, e)
+            if stats is not None:
+                stats.add_error(e, document)
+            return ""
+
+    def __init_with_stats(self, text, preprocesshtml, forcePeriod, lazy, stats):
+        """
+            Same as __init__, timing each stage.
+        """
+        self.__stats = stats
+        document = DocumentStats()
+        self.text = self.__preprocess(text, preprocesshtml, forcePeriod, stats, document)
+
+        if not lazy:
+            with stats.stage("sentences", document):
+                number_sentences = _count_sentences(self._tokenize_sentences(self.text))
+
+            counter = get_syllable_counter(self.language)
+            before = counter.cache_info()
+            with stats.stage("words", document):
+                self._reset()
+                self._update(self.text, number_sentences)
+            after = counter.cache_info()
+
+            stats.add_syllable_cache(after.hits - before.hits, after.misses - before.misses, document)
+            document.sentences = self.__number_sentences
+            document.words = self.__number_words
+
+        stats.add_document(document)
+
+    def __getattr__(self, name):
+        # Only reached for counters not computed yet, i.e., in lazy mode,
+        # and for the text of a document whose counters came from the cache.
+        if name == "text" and "_ReadCalc__source" in self.__dict__:
+            self.text = self.__preprocess(*self.__dict__.pop("_ReadCalc__source"))
+            return self.text
+        if self.__dict__.get("text") is None:
+            raise AttributeError(name)
+        if name == "_ReadCalc__number_sentences":
+            stage, analyse = "sentences", self.__analyse_sentences
+        elif name in ("_ReadCalc__number_words", "_ReadCalc__number_types", "_ReadCalc__number_chars",
+                      "_ReadCalc__number_words_larger_X", "_ReadCalc__types", "_ReadCalc__word_lengths",
+                      "_ReadCalc__frequencies"):
+            stage, analyse = "words", self.__analyse_words
+        elif name in ("_ReadCalc__number_syllables", "_ReadCalc__number_polysyllable_words"):
+            stage, analyse = "syllables", self.__analyse_syllables
+        elif name == "_ReadCalc__difficult_words":
+            stage, analyse = "dale_chall", self.__analyse_difficult_words
+        else:
+            raise AttributeError(name)
+
+        stats = self.__dict__.get("_ReadCalc__stats")
+        if stats is None:
+            analyse()
+        else:
+            with stats.stage(stage):
+                analyse()
+        return object.__getattribute__(self, name)
+
+    def __analyse_sentences(self):
+        self.__number_sentences = _count_sentences(self._tokenize_sentences(self.text))
+
+    def __analyse_words(self):
+        # The frequency of each word is kept, so that syllables and Dale-Chall lookups
+        # are done once per unique word.
+        frequencies = {}
+        for word in self._tokenize_words(self.text):
+            frequencies[word] = frequencies.get(word, 0) + 1
+
+        word_lengths = {}
+        words = chars = 0
+        for word, frequency in frequencies.items():
+            size = len(word)
+            words += frequency
+            chars += size * frequency
+            word_lengths[size] = word_lengths.get(size, 0) + frequency
+
+        self.__frequencies = frequencies
+        self.__types = set(frequencies)
+        self.__word_lengths = word_lengths
+        self.__number_words = words
+        self.__number_types = len(frequencies)
+        self.__number_chars = chars
+        self.__number_words_larger_X = self.__get_word_sizes(word_lengths)
+
+    def __analyse_syllables(self):
+        counter = get_syllable_counter(self.language)
+        before = counter.cache_info()
+        frequencies = self.__frequencies
+
+        syllables = polysyllable_words = 0
+        for word, frequency in frequencies.items():
+            syl = counter.count(word)
+            syllables += syl * frequency
+            if syl >= 3:
+                polysyllable_words += frequency
+        self.__number_syllables = syllables
+        self.__number_polysyllable_words = polysyllable_words
+
+        stats = self.__dict__.get("_ReadCalc__stats")
+        if stats is not None:
+            after = counter.cache_info()
+            stats.add_syllable_cache(after.hits - before.hits, after.misses - before.misses)
+
+    def __analyse_difficult_words(self):
+        dale_chall_words = get_dale_chall_words()
+        self.__difficult_words = sum(frequency for word, frequency in self.__frequencies.items()
+                                     if word not in dale_chall_words)
 
     def __repr__(self):
         ret = []
@@ -74,95 +332,143 @@ class ReadCalc:
         return "\n".join(ret)
 
     def analyse_text(self):
-        # Divide text into sentences
-        sentences = self.get_sentences()
-        self.__number_sentences = len(sentences)
-
-        # Divide text into words
-        words = self.get_words()
-        self.__number_words = len(words)
-        self.__number_types = len(set(words))
-
-        self.__number_chars = self.__get_number_chars(words)
-
-        self.__number_syllables, self.__number_polysyllable_words =\
-            self.__get_number_syllables(words)
+        """
+            Computes all counters in a single pass over the words of the text.
+        """
+        self._reset()
+        self._update(self.text)
 
-        self.__number_words_larger_X = self.__get_word_sizes(words)
-        self.__difficult_words = self.__get_dale_chall_difficult_words(words)
+    def _reset(self, types=None):
+        """
+            Sets all counters to zero.
+            types is the container of unique words: a set (default) or a counts.HyperLogLog.
+        """
+        self.__number_sentences = 0
+        self.__number_words = 0
+        self.__number_types = 0
+        self.__number_chars = 0
+        self.__number_syllables = 0
+        self.__number_polysyllable_words = 0
+        self.__number_words_larger_X = {}
+        self.__difficult_words = 0
+        self.__types = set() if types is None else types
+        self.__word_lengths = {}
+
+    def _update(self, text, number_sentences=None, final=True):
+        """
+            Adds the counters of a piece of text to the current ones.
+            The piece should end at a sentence boundary, otherwise words can be split in two.
+            number_sentences can be given if the sentences of the piece were already counted.
+            final is False when more text follows the piece.
+        """
+        if number_sentences is None:
+            number_sentences = _count_sentences(self._tokenize_sentences(text))
+
+        count_syllables = get_syllable_counter(self.language).count
+        dale_chall_words = get_dale_chall_words()
+        types = self.__types
+        word_lengths = self.__word_lengths
+        chars = words = syllables = polysyllable_words = difficult_words = 0
+
+        for word in self._tokenize_words(text, final):
+            size = len(word)
+            words += 1
+            chars += size
+            types.add(word)
+            word_lengths[size] = word_lengths.get(size, 0) + 1
+
+            syl = count_syllables(word)
+            syllables += syl
+            if syl >= 3:
+                polysyllable_words += 1
+
+            if word not in dale_chall_words:
+                difficult_words += 1
+
+        self.__number_sentences += number_sentences
+        self.__number_words += words
+        self.__number_types = len(types)
+        self.__number_chars += chars
+        self.__number_syllables += syllables
+        self.__number_polysyllable_words += polysyllable_words
+        self.__number_words_larger_X = self.__get_word_sizes(word_lengths)
+        self.__difficult_words += difficult_words
+
+    @classmethod
+    def from_counts(cls, counts, language="en", tokenizer="nltk"):
+        """
+            Builds a ReadCalc from a ReadabilityCounts, e.g., the sum of the counts of many texts.
+            The new object has no text (get_sentences() and get_words() are not available),
+            but all indices and metrics can be computed.
+        """
+        calc = cls.__new__(cls)
+        calc.language = language
+        calc.tokenizer = tokenizer
+        calc._tokenize_sentences, calc._tokenize_words = _get_tokenizer(tokenizer)
+        calc.text = None
+        calc._restore_counts(counts)
+        return calc
+
+    def _restore_counts(self, counts):
+        """
+            Sets all counters to (a copy of) the ones of a ReadabilityCounts.
+        """
+        self._reset(copy.deepcopy(counts.types))
+        self.__word_lengths = dict(counts.word_lengths)
+        self.__number_sentences = counts.sentences
+        self.__number_words = counts.words
+        self.__number_types = counts.number_types
+        self.__number_chars = counts.chars
+        self.__number_syllables = counts.syllables
+        self.__number_polysyllable_words = counts.polysyllable_words
+        self.__number_words_larger_X = self.__get_word_sizes(self.__word_lengths)
+        self.__difficult_words = counts.difficult_words
+
+    def get_counts(self, approximate_types=False, precision=12):
+        """
+            Returns a ReadabilityCounts with a copy of the counters of this text.
+            Counts of different texts can be added together and turned back into a ReadCalc with from_counts().
 
-        # Clean up
-        for s in sentences:
-            del s
-        for w in words:
-            del w
+            approximate_types:
+              If True, the unique words are stored in a HyperLogLog of the given precision instead of a set.
+        """
+        if approximate_types and not isinstance(self.__types, HyperLogLog):
+            types = HyperLogLog(precision)
+            types.update(self.__types)
+        else:
+            types = copy.deepcopy(self.__types)
+        return ReadabilityCounts(chars=self.__number_chars, words=self.__number_words,
+                                 sentences=self.__number_sentences, syllables=self.__number_syllables,
+                                 polysyllable_words=self.__number_polysyllable_words,
+                                 difficult_words=self.__difficult_words, word_lengths=dict(self.__word_lengths),
+                                 types=types)
 
     def get_sentences(self):
         """
             Returns a list of all sentences found in the text.
         """
-        sentences = tokenize.sent_tokenize(self.text)
-
-        sentences_only_chars = []
         # Remove sentences containing only punctuation:
-        for sentence in sentences:
-            if re.sub("\W", "", sentence):
-                sentences_only_chars.append(sentence)
-
-        return sentences_only_chars
+        return [sentence for sentence in self._tokenize_sentences(self.text) if _word_char.search(sentence)]
 
     def get_words(self):
         """
             Returns a list of all words found in the text.
         """
+        return list(self._tokenize_words(self.text))
 
-        word_tokenizer = tokenize.TreebankWordTokenizer()
-        words = [w.strip().lower() for w in word_tokenizer.tokenize(self.text) if w.strip()]
-
-        # Remove punctuation from words:
-        # Ex.:  <<This is the final.>>  becomes
-        # ['<','<', 'This', 'is', 'the', 'final', '.', '>', '>'] -> ['This', 'is', 'the', 'final']
-        words = [re.sub("\W", '', word) for word in words]
-        words = [word for word in words if word]
-
-        return words
-
-    def __get_number_chars(self, words):
+    def __get_word_sizes(self, word_lengths):
         """
-            Returns the total number of chars in the text.
+            Turns a histogram {word length: number of words} into {X: number of words longer than X}.
         """
-        chars = 0
-        for word in words:
-            chars += len(word)
-        return chars
-
-    def __get_number_syllables(self, words):
-        dic = pyphen.Pyphen(lang=self.language)
-
-        syllables = 0
-        words_3_syllables_more = 0
-
-        for word in words:
-            syl = len(dic.inserted(word).split("-"))
-            syllables += syl
-            if syl >= 3:
-                words_3_syllables_more += 1
-        return syllables, words_3_syllables_more
-
-    def __get_word_sizes(self, words):
-        if len(words) == 0:
-            return []
-
-        sizes = [len(word) - 0.5 for word in words]
-        sorted_sizes = sorted(sizes)
-        number_words = len(sizes)
-        larger_size = int(sorted_sizes[-1] + 0.5)
+        if len(word_lengths) == 0:
+            return {}
 
         number_words_larger_X = {}
+        larger = 0
 
-        for S in range(0, larger_size + 1):
-            positionS = bisect.bisect_left(sorted_sizes, S)
-            number_words_larger_X[S] = number_words - positionS
+        for S in range(max(word_lengths), -1, -1):
+            number_words_larger_X[S] = larger
+            larger += word_lengths.get(S, 0)
 
         return number_words_larger_X
 
@@ -247,9 +553,6 @@ class ReadCalc:
         long_words = self.get_words_longer_than_X(6)
         return self.__number_words / self.__number_sentences + ((100.0 * long_words) / self.__number_words)
 
-    def __get_dale_chall_difficult_words(self, words):
-        return len([word for word in words if word not in dale_chall_words])
-
     def get_dale_chall_score(self):
         # http://en.wikipedia.org/wiki/Dale%E2%80%93Chall_readability_formula
         """
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+    python -m readcalc.serve [--host 127.0.0.1] [--port 8000] [--workers N] ...
+
+    A small HTTP/JSON scoring service (standard library only), e.g. to run next to another service.
+
+    POST /score
+      {"text": "...", "language": "en", "preprocesshtml": null, "forcePeriod": false, "tokenizer": "nltk"}
+        returns {"number_chars": ..., ..., "dale_chall_score": ...}, the fields of ReadCalc.get_all_metrics().
+      {"documents": ["...", {"text": "...", "id": 7, "language": "de"}, ...], "language": "en", ...}
+        returns {"results": [...]}, one object per document (with its "id", if given) or {"error": "..."}.
+        Options given next to "documents" are the defaults of every document.
+
+    GET /health
+      returns {"status": "ok"}.
+
+    GET /stats
+      returns the number of requests, rejections and latency histograms of the server and of the scorer.
+
+    Requests are rejected with 503 when more than --max-concurrency of them are being scored.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from http import HTTPStatus
+
+from .aio import AsyncScorer
+from .batch import metrics_to_dict
+from .cache import ResultCache
+from .stats import LatencyHistogram
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+OPTIONS = ("language", "preprocesshtml", "forcePeriod", "tokenizer")
+
+
+class BadRequest(Exception):
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        Exception.__init__(self, message)
+        self.status = status
+
+
+class ReadCalcServer:
+
+    def __init__(self, scorer, max_concurrency=64, max_batch=1000, max_body=16 << 20):
+        """
+            ReadCalcServer(scorer, max_concurrency=64, max_batch=1000, max_body=16MB).
+
+            scorer:
+              The AsyncScorer that computes the metrics.
+
+            max_concurrency:
+              Maximum number of /score requests being scored at once. Further requests get 503 (with
+              Retry-After) instead of queuing without bounds.
+
+            max_batch, max_body:
+              Maximum number of documents and bytes in one request. Larger requests get 413.
+        """
+        self.scorer = scorer
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self.max_body = max_body
+
+        self.active = 0
+        self.requests = 0
+        self.rejected = 0
+        self.latency = {}
+        self.started = time.time()
+
+    def __observe(self, path, seconds):
+        histogram = self.latency.get(path)
+        if histogram is None:
+            histogram = self.latency[path] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def summary(self):
+        return {
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "latency": dict((path, histogram.summary()) for path, histogram in self.latency.items()),
+            "scorer": self.scorer.summary(),
+        }
+
+    async def handle_connection(self, reader, writer):
+        """
+            Serves the requests of one connection (HTTP/1.1 keep-alive is supported).
+        """
+        try:
+            while True:
+                try:
+                    request = await self.__read_request(reader)
+                except BadRequest as error:
+                    self.__write_response(writer, error.status, {"error": str(error)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, keep_alive, body = request
+                start = time.perf_counter()
+                status, payload, headers = await self.dispatch(method, path, body)
+                self.__observe(path if path in ("/score", "/health", "/stats") else "other",
+                               time.perf_counter() - start)
+
+                self.__write_response(writer, status, payload, keep_alive, headers)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise BadRequest("Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise BadRequest("Invalid Content-Length")
+        if length > self.max_body:
+            raise BadRequest("Request body larger than %d bytes" % self.max_body, HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return method.upper(), target.split("?", 1)[0], keep_alive, body
+
+    def __write_response(self, writer, status, payload, keep_alive, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        lines = ["HTTP/1.1 %d %s" % (status, status.phrase),
+                 "Content-Type: application/json",
+                 "Content-Length: %d" % len(body),
+                 "Connection: %s" % ("keep-alive" if keep_alive else "close")]
+        for name, value in (headers or {}).items():
+            lines.append("%s: %s" % (name, value))
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def dispatch(self, method, path, body):
+        """
+            Returns (status, payload, extra headers) for one request.
+        """
+        self.requests += 1
+        if path == "/health":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET"}, {"Allow": "GET"}
+            return HTTPStatus.OK, {"status": "ok"}, None
+        if path == "/stats":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET"}, {"Allow": "GET"}
+            return HTTPStatus.OK, self.summary(), None
+        if path != "/score":
+            return HTTPStatus.NOT_FOUND, {"error": "Unknown path %s" % path}, None
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}, {"Allow": "POST"}
+
+        if self.active >= self.max_concurrency:
+            self.rejected += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many concurrent requests"}, {"Retry-After": "1"}
+
+        self.active += 1
+        try:
+            return await self.score(body)
+        except BadRequest as error:
+            return error.status, {"error": str(error)}, None
+        finally:
+            self.active -= 1
+
+    async def score(self, body):
+        try:
+            request = json.loads(body.decode("utf-8"))
+        except ValueError as error:
+            raise BadRequest("Invalid JSON: %s" % error)
+        if not isinstance(request, dict):
+            raise BadRequest("Expected a JSON object")
+
+        defaults = self.__get_options(request, {})
+        if "documents" not in request:
+            text = request.get("text")
+            if not isinstance(text, str):
+                raise BadRequest("Expected \"text\" (a string) or \"documents\" (a list)")
+            try:
+                metrics = await self.scorer.score(text, **defaults)
+            except Exception as error:
+                return HTTPStatus.UNPROCESSABLE_ENTITY, {"error": "%s: %s" % (type(error).__name__, error)}, None
+            return HTTPStatus.OK, metrics_to_dict(metrics), None
+
+        documents = request["documents"]
+        if not isinstance(documents, list):
+            raise BadRequest("\"documents\" must be a list")
+        if len(documents) > self.max_batch:
+            raise BadRequest("More than %d documents" % self.max_batch, HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        jobs = []
+        for document in documents:
+            if isinstance(document, str):
+                document = {"text": document}
+            if not isinstance(document, dict) or not isinstance(document.get("text"), str):
+                raise BadRequest("Each document must be a string or an object with a \"text\" string")
+            jobs.append((document, self.__get_options(document, defaults)))
+
+        results = await asyncio.gather(*[self.scorer.score(document["text"], **options) for document, options in jobs],
+                                       return_exceptions=True)
+        payload = []
+        for (document, _), metrics in zip(jobs, results):
+            if isinstance(metrics, BaseException):
+                result = {"error": "%s: %s" % (type(metrics).__name__, metrics)}
+            else:
+                result = metrics_to_dict(metrics)
+            if "id" in document:
+                result["id"] = document["id"]
+            payload.append(result)
+        return HTTPStatus.OK, {"results": payload}, None
+
+    def __get_options(self, document, defaults):
+        options = dict(defaults)
+        for name in OPTIONS:
+            if name in document:
+                options[name] = document[name]
+        if not isinstance(options.get("language", "en"), str):
+            raise BadRequest("\"language\" must be a string")
+        return options
+
+
+async def serve(host="127.0.0.1", port=8000, scorer=None, **options):
+    """
+        Runs the server until it is cancelled. options are given to ReadCalcServer.
+    """
+    scorer = scorer if scorer is not None else AsyncScorer()
+    # The workers must be forked before the server socket and its connections exist
+    await scorer.start()
+    app = ReadCalcServer(scorer, **options)
+    server = await asyncio.start_server(app.handle_connection, host, port)
+    for sock in server.sockets:
+        print("Serving on http://%s:%d" % sock.getsockname()[:2], file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        scorer.close(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m readcalc.serve", description=__doc__.strip().split("\n")[2].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: number of cores)")
+    parser.add_argument("--language", default="en", help="language loaded in advance by the workers")
+    parser.add_argument("--tokenizer", default="nltk", choices=("nltk", "fast"),
+                        help="tokenizer loaded in advance by the workers")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="concurrent /score requests")
+    parser.add_argument("--max-pending", type=int, default=1024, help="documents queued or being scored")
+    parser.add_argument("--max-batch", type=int, default=1000, help="documents per request")
+    parser.add_argument("--batch-size", type=int, default=32, help="documents sent to a worker at once")
+    parser.add_argument("--batch-delay", type=float, default=0.002, help="seconds to wait for a batch to fill up")
+    parser.add_argument("--cache-entries", type=int, default=0, help="results kept in memory (default: no cache)")
+    parser.add_argument("--cache-path", default=None, help="sqlite file with a persistent result cache")
+    parser.add_argument("--cache-max-bytes", type=int, default=1 << 30, help="maximum size of the persistent cache")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache_entries or args.cache_path:
+        cache = ResultCache(max_entries=args.cache_entries or 10000, path=args.cache_path,
+                            max_disk_bytes=args.cache_max_bytes)
+    scorer = AsyncScorer(workers=args.workers, max_pending=args.max_pending, batch_size=args.batch_size,
+                         batch_delay=args.batch_delay, language=args.language, tokenizer=args.tokenizer, cache=cache)
+    try:
+        asyncio.run(serve(args.host, args.port, scorer, max_concurrency=args.max_concurrency,
+                          max_batch=args.max_batch))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
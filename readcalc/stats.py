@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from __future__ import division
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+_active = None
+
+
+class DocumentStats:
+
+    def __init__(self):
+        """
+            What happened while one ReadCalc object was built.
+
+            stages:
+              Dictionary {stage: seconds}. Stages are preprocess, sentences and words (tokenization, syllables
+              and Dale-Chall lookups, all done in the same pass). In lazy mode, only preprocess is known when
+              the object is created; the other stages are added to the totals of ReadCalcStats when they run.
+        """
+        self.stages = {}
+        self.sentences = None
+        self.words = None
+        self.syllable_hits = 0
+        self.syllable_misses = 0
+        self.error = None
+
+    def __repr__(self):
+        return "DocumentStats(stages=%r, sentences=%r, words=%r, syllable_hits=%d, syllable_misses=%d, error=%r)" %\
+                (self.stages, self.sentences, self.words, self.syllable_hits, self.syllable_misses, self.error)
+
+
+class ReadCalcStats:
+
+    def __init__(self, hook=None, max_errors=100):
+        """
+            ReadCalcStats(hook=None, max_errors=100).
+
+            Collects per-stage durations, counts, syllable cache hits and preprocessing errors of every
+            ReadCalc built while it is active (see enable()) or given as ReadCalc(..., stats=...).
+
+            hook:
+              Optional function called with the DocumentStats of each document, e.g., to send them to a
+              metrics system.
+
+            max_errors:
+              Number of most recent errors kept in self.errors.
+        """
+        self.hook = hook
+        self.errors = deque(maxlen=max_errors)
+        self.reset()
+
+    def reset(self):
+        self.documents = 0
+        self.failures = 0
+        self.sentences = 0
+        self.words = 0
+        self.syllable_hits = 0
+        self.syllable_misses = 0
+        self.stage_seconds = {}
+        self.stage_calls = {}
+        self.errors.clear()
+
+    @contextmanager
+    def stage(self, name, document=None):
+        """
+            Times the enclosed block and adds it to the totals (and to the document, if given).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + elapsed
+            self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+            if document is not None:
+                document.stages[name] = document.stages.get(name, 0.0) + elapsed
+
+    def add_syllable_cache(self, hits, misses, document=None):
+        self.syllable_hits += hits
+        self.syllable_misses += misses
+        if document is not None:
+            document.syllable_hits += hits
+            document.syllable_misses += misses
+
+    def add_error(self, error, document=None):
+        self.failures += 1
+        self.errors.append("%s -- %s" % (type(error).__name__, error))
+        if document is not None:
+            document.error = error
+
+    def add_document(self, document):
+        self.documents += 1
+        self.sentences += document.sentences or 0
+        self.words += document.words or 0
+        if self.hook is not None:
+            self.hook(document)
+
+    def get_syllable_hit_rate(self):
+        total = self.syllable_hits + self.syllable_misses
+        if total == 0:
+            return 0.0
+        return self.syllable_hits / total
+
+    def summary(self):
+        """
+            Returns a dictionary with all totals, ready to be logged or serialized to JSON.
+        """
+        return {
+            "documents": self.documents,
+            "failures": self.failures,
+            "sentences": self.sentences,
+            "words": self.words,
+            "syllable_hits": self.syllable_hits,
+            "syllable_misses": self.syllable_misses,
+            "syllable_hit_rate": self.get_syllable_hit_rate(),
+            "stage_seconds": dict(self.stage_seconds),
+            "stage_calls": dict(self.stage_calls),
+            "errors": list(self.errors),
+        }
+
+
+class LatencyHistogram:
+
+    # Upper bounds (in seconds) of the buckets, the last bucket has no upper bound
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=BUCKETS):
+        """
+            LatencyHistogram(buckets=LatencyHistogram.BUCKETS).
+
+            Counts durations in fixed buckets, so that it uses constant memory however many
+            durations are observed. Percentiles are approximated by the upper bound of their bucket.
+        """
+        self.buckets = tuple(buckets)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """
+            Returns the upper bound of the bucket with the q-th percentile (0 < q <= 100), the largest
+            observed duration if it is in the last bucket, or 0.0 if nothing was observed.
+        """
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return 0.0
+
+    def summary(self):
+        """
+            Returns a dictionary with the count, mean, max, p50, p90, p99 and the number of durations per
+            bucket (keyed by the upper bound, "+inf" for the last one).
+        """
+        buckets = dict(("%g" % bound, n) for bound, n in zip(self.buckets, self.counts))
+        buckets["+inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+def enable(stats=None, hook=None):
+    """
+        Makes every new ReadCalc report to stats (a new ReadCalcStats with the given hook if None).
+        Returns the active ReadCalcStats.
+    """
+    global _active
+    _active = stats if stats is not None else ReadCalcStats(hook)
+    return _active
+
+
+def disable():
+    """
+        Stops collecting statistics. This is the default: ReadCalc then does no timing at all.
+    """
+    global _active
+    _active = None
+
+
+def get_stats():
+    """
+        Returns the active ReadCalcStats, or None if statistics are disabled.
+    """
+    return _active
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import copy
+import re
+from functools import partial
+
+from .readcalc import ReadCalc, _count_sentences, _get_tokenizer, _word_char
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+# Chars that can end a sentence, for both tokenizers.
+_terminator = re.compile(r"[.!?]")
+
+
+class ReadCalcAccumulator(ReadCalc):
+
+    def __init__(self, language="en", max_pending=1 << 16, types=None, tokenizer="nltk"):
+        """
+            ReadCalcAccumulator(language="en", max_pending=65536, types=None, tokenizer="nltk").
+
+            Computes the same metrics as ReadCalc for a text that is given in chunks, e.g.,
+            read from a (gzip) file object or produced by a generator.
+            Only the counters and the set of unique words are kept in memory, never the text itself.
+
+            >>> acc = ReadCalcAccumulator()
+            >>> for chunk in chunks:
+            ...     acc.feed(chunk)
+            >>> acc.close()
+            >>> acc.get_flesch_reading_ease()
+
+            All get_* methods can be called at any time. Before close() is called, they only take into
+            account the sentences already completed. Use result() to get a ReadCalc that also includes
+            the unfinished sentence. get_sentences() and get_words() are not supported, as the text is not
+            kept: they raise a TypeError.
+
+            language, tokenizer:
+              Same as in ReadCalc.
+
+            max_pending:
+              Maximum number of chars of an unfinished sentence kept in memory.
+              Longer sentences (e.g. logs without punctuation) are counted in pieces cut at a white space.
+
+            types:
+              Container of the unique words. Default is a set; use a counts.HyperLogLog to keep memory constant
+              at the cost of an approximate number of unique words.
+        """
+        self.language = language
+        self.tokenizer = tokenizer
+        self._tokenize_sentences, self._tokenize_words = _get_tokenizer(tokenizer)
+        self.max_pending = max_pending
+        self.__pending = ""
+        # True if part of the pending sentence was already counted because it was too long.
+        self.__partial = False
+        # No sentence of the pending text ends before this offset.
+        self.__checked = 0
+        self._reset(types)
+
+    def get_sentences(self):
+        raise TypeError("get_sentences() is not supported by ReadCalcAccumulator, which does not keep the text")
+
+    def get_words(self):
+        raise TypeError("get_words() is not supported by ReadCalcAccumulator, which does not keep the text")
+
+    def feed(self, chunk):
+        """
+            Adds a chunk of text. Sentences and words can be split across chunks.
+            The pending text is only segmented again if a sentence can have ended: the chunk, or the end of
+            the text before it, has a period, question or exclamation mark. Only its end is segmented, from
+            the last tokens that were followed by too little text to know if they end a sentence.
+        """
+        pending = self.__pending
+        self.__pending += chunk
+        if not (_terminator.search(chunk) or _terminator.search(pending, max(0, len(pending) - 64)) or
+                len(self.__pending) > self.max_pending):
+            return
+        checked = self.__checked
+        sentences = self._tokenize_sentences(self.__pending[checked:])
+
+        if len(sentences) > 1:
+            # The first sentence starts before the segmented text.
+            sentences[0] = self.__pending[:checked] + sentences[0]
+            # The last sentence may continue in the next chunk.
+            start = self.__pending.rfind(sentences[-1])
+            self.__commit(self.__pending[:start], sentences[:-1])
+            self.__pending = self.__pending[start:]
+
+        if len(self.__pending) > self.max_pending:
+            # The piece counted keeps the white space it is cut at: the Treebank tokenizer splits
+            # some words (can't, it's) only when a space follows them.
+            cut = max(self.__pending.rfind(" "), self.__pending.rfind("\n")) + 1
+            if cut > 1:
+                head = self.__pending[:cut]
+                if _word_char.search(head):
+                    self._update(head, 0, final=False)
+                    self.__partial = True
+                self.__pending = self.__pending[cut:]
+
+        # Whether a token ends a sentence depends on the tokens that follow it, so the last 256 chars
+        # are segmented again with the next chunks.
+        end = len(self.__pending) - 256
+        if end > 0:
+            self.__checked = max(self.__pending.rfind(" ", 0, end), self.__pending.rfind("\n", 0, end)) + 1
+        else:
+            self.__checked = 0
+
+    def __commit(self, text, sentences, final=False):
+        number_sentences = _count_sentences(sentences)
+        if self.__partial and (not sentences or not _word_char.search(sentences[0])):
+            # The first sentence had its words counted before, but not the sentence itself.
+            number_sentences += 1
+        self.__partial = False
+        self._update(text, number_sentences, final)
+
+    def consume(self, source, chunk_size=1 << 16):
+        """
+            Feeds a whole file object (read chunk_size chars at a time) or any iterable of strings,
+            and closes the accumulator. Returns the accumulator itself.
+        """
+        chunks = iter(partial(source.read, chunk_size), "") if hasattr(source, "read") else source
+        for chunk in chunks:
+            self.feed(chunk)
+        self.close()
+        return self
+
+    def close(self):
+        """
+            Counts the last, unfinished sentence. Call it when there is no more text.
+        """
+        pending = self.__pending
+        self.__pending = ""
+        self.__commit(pending, self._tokenize_sentences(pending), final=True)
+
+    def result(self):
+        """
+            Returns a copy of the accumulator with everything fed so far, including the unfinished sentence.
+            The accumulator itself is not changed and can keep receiving text.
+        """
+        snapshot = copy.deepcopy(self)
+        snapshot.close()
+        return snapshot
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from functools import lru_cache
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+'''
+
+DEFAULT_CACHE_SIZE = 100000
+
+_cache_size = DEFAULT_CACHE_SIZE
+_counters = {}
+
+
+class SyllableCounter:
+
+    def __init__(self, language="en", cache_size=DEFAULT_CACHE_SIZE):
+        """
+            SyllableCounter(language="en", cache_size=100000).
+
+            Keeps one pyphen dictionary loaded and remembers the number of syllables of the most
+            recently used words, so that frequent words are hyphenated only once.
+
+            cache_size:
+              Maximum number of words kept in the LRU cache.
+              None means unbounded and 0 disables the cache.
+        """
+        self.language = language
+        self.cache_size = cache_size
+        import pyphen
+        self.__dic = pyphen.Pyphen(lang=language)
+        self.count = lru_cache(maxsize=cache_size)(self.__count)
+
+    def __repr__(self):
+        info = self.cache_info()
+        return "SyllableCounter(language=%r, hits=%d, misses=%d, size=%d/%s)" %\
+                (self.language, info.hits, info.misses, info.currsize, info.maxsize)
+
+    def __count(self, word):
+        return len(self.__dic.inserted(word).split("-"))
+
+    def cache_info(self):
+        """
+            Returns a named tuple with (hits, misses, maxsize, currsize).
+        """
+        return self.count.cache_info()
+
+    def clear(self):
+        """
+            Empties the cache and resets the hit/miss counters.
+        """
+        self.count.cache_clear()
+
+
+def get_syllable_counter(language="en"):
+    """
+        Returns the SyllableCounter shared by every document of the given language.
+    """
+    counter = _counters.get(language)
+    if counter is None:
+        counter = _counters[language] = SyllableCounter(language, _cache_size)
+    return counter
+
+
+def configure_syllable_cache(cache_size=DEFAULT_CACHE_SIZE):
+    """
+        Sets the size of the cache of every shared SyllableCounter.
+        Counters already created are dropped, together with their cached words and statistics.
+    """
+    global _cache_size
+    _cache_size = cache_size
+    _counters.clear()
+
+
+def syllable_cache_info():
+    """
+        Returns a dictionary language -> cache_info() of every shared SyllableCounter.
+    """
+    return dict((language, counter.cache_info()) for language, counter in _counters.items())
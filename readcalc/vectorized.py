@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+'''
+Author: Joao Palotti <joaopalotti@gmail.com>
+
+Readability formulas for many texts at once, computed on NumPy arrays of counters.
+'''
+
+# Same order as ReadCalc.get_internal_metrics()
+METRICS = ("number_chars", "number_words", "number_types", "number_sentences", "number_syllables",
+           "number_polysyllable_words", "difficult_words", "number_words_longer_4", "number_words_longer_6",
+           "number_words_longer_10", "number_words_longer_13")
+
+# Same order as the indices in ReadCalc.get_all_metrics(), followed by the Dale-Chall known fraction
+INDICES = ("flesch_reading_ease", "flesch_kincaid_grade_level", "coleman_liau_index", "gunning_fog_index",
+           "smog_index", "ari_index", "lix_index", "dale_chall_score", "dale_chall_known_fraction")
+
+
+def metrics_to_columns(rows):
+    """
+        Turns rows shaped as ReadCalc.get_internal_metrics() or ReadCalc.get_all_metrics()
+        (e.g. the output of score_many) into a dictionary {metric name: integer array}.
+    """
+    table = np.array([tuple(row)[:len(METRICS)] for row in rows], dtype=np.int64).reshape(-1, len(METRICS))
+    return dict((name, table[:, i]) for i, name in enumerate(METRICS))
+
+
+def compute_indices(number_chars, number_words, number_sentences, number_syllables, number_polysyllable_words,
+                    difficult_words, number_words_longer_6, **ignored):
+    """
+        Computes all readability indices of many texts in one vectorized pass.
+        Each argument is an array (or list) with one counter per text. Extra keyword arguments are ignored,
+        so the output of metrics_to_columns() can be given directly: compute_indices(**columns).
+
+        Returns a dictionary {index name: float array}.
+        Texts without sentences (or words) get the same values as the ReadCalc methods.
+        Where ReadCalc would divide by zero, the result is nan.
+    """
+    chars = np.asarray(number_chars, dtype=np.float64)
+    words = np.asarray(number_words, dtype=np.float64)
+    sentences = np.asarray(number_sentences, dtype=np.float64)
+    syllables = np.asarray(number_syllables, dtype=np.float64)
+    polysyllables = np.asarray(number_polysyllable_words, dtype=np.float64)
+    difficult = np.asarray(difficult_words, dtype=np.float64)
+    long_words = np.asarray(number_words_longer_6, dtype=np.float64)
+
+    no_sentences = sentences == 0
+    no_words = words == 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        words_per_sentence = words / sentences
+        syllables_per_word = syllables / words
+        chars_per_word = chars / words
+
+        indices = {
+            "flesch_reading_ease":
+                np.where(no_sentences, 100.0, 206.835 - 1.015 * words_per_sentence - 85.6 * syllables_per_word),
+            "flesch_kincaid_grade_level":
+                np.where(no_sentences, 0.0, 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59),
+            "coleman_liau_index":
+                np.where(no_sentences & no_words, 0.0,
+                         (5.89 * chars / words) - (30.0 * (sentences / words)) - 15.8),
+            "gunning_fog_index":
+                np.where(no_sentences, 0.0, 0.4 * (words_per_sentence + 100.0 * (polysyllables / words))),
+            "smog_index":
+                np.where(no_sentences, 0.0, 1.0430 * np.sqrt(polysyllables * 30.0 / sentences) + 3.1291),
+            "ari_index":
+                np.where(no_sentences, 0.0, 4.71 * chars_per_word + 0.5 * words_per_sentence - 21.43),
+            "lix_index":
+                np.where(no_sentences, 0.0, words_per_sentence + ((100.0 * long_words) / words)),
+            "dale_chall_score":
+                np.where(no_sentences, 0.0, 0.1579 * (difficult / words * 100.0) + 0.0496 * words_per_sentence),
+            "dale_chall_known_fraction":
+                np.where(no_words, 0.0, 1.0 - (difficult / words)),
+        }
+
+    return indices
+
+
+def to_structured_array(*column_dicts):
+    """
+        Joins dictionaries of equally long arrays (e.g. the output of metrics_to_columns and compute_indices)
+        into one NumPy structured array, with one record per text.
+    """
+    columns = {}
+    for column_dict in column_dicts:
+        columns.update(column_dict)
+    names = list(columns)
+    arrays = [np.asarray(columns[name]) for name in names]
+    table = np.empty(len(arrays[0]) if arrays else 0, dtype=[(name, a.dtype) for name, a in zip(names, arrays)])
+    for name, a in zip(names, arrays):
+        table[name] = a
+    return table
+
+
+def to_dataframe(*column_dicts):
+    """
+        Same as to_structured_array, but returns a pandas DataFrame (pandas must be installed).
+    """
+    import pandas as pd
+    columns = {}
+    for column_dict in column_dicts:
+        columns.update(column_dict)
+    return pd.DataFrame(columns)
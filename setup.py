@@ -1,5 +1,6 @@
 from distutils.core import setup
 #from Cython.Build import cythonize
+import re
 
 from setuptools import find_packages, setup
 from setuptools.command.install import install as _install
@@ -13,13 +14,19 @@ requirements = [
     "beautifulsoup4 >= 4.5.0",
 ]
 
+# The version is only written in readcalc/__init__.py.
+version = re.search(r'^__version__ = "(.+)"$', open('readcalc/__init__.py').read(), re.M).group(1)
+
 setup(name='ReadabilityCalculator',
-        version='0.2.36',
+        version=version,
         author='Joao Palotti',
         author_email='joaopalotti@gmail.com',
         license='LICENSE.txt',
         install_requires=requirements,
+        extras_require={"numpy": ["numpy"], "parquet": ["pyarrow"]},
+        entry_points={"console_scripts": ["readcalc = readcalc.cli:main"]},
         packages=['readcalc'],
+        package_data={'readcalc': ['data/*.txt']},
         url='http://pypi.python.org/pypi/ReadabilityCalculator/',
         description='Estimate the readability of a text, e.g., the required reading skill level to understand a text.',
         long_description=open('README.txt').read()
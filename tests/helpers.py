@@ -0,0 +1,33 @@
+# encoding: utf-8
+
+import random
+
+# Tokens that exercise the corner cases of the tokenizers: contractions, quotes, abbreviations,
+# ellipses, line breaks and non ASCII words.
+PIECES = ["Don't", "stop,", "it's", "o'clock.", '"Hello"', "(world)", "cannot", "\n", "Mr.", "Smith's", "well...",
+          "Naïve", "café!", "wasn't?", "and", "extraordinary", "establishment.", "it's.", "Smith's.\n", "he'd.\n\n",
+          "3.5", "U.S.", "the", "reading", "level", "of", "a", "text."]
+
+
+def make_texts(number, words=80, seed=0):
+    """
+        Returns a list of reproducible random texts made of PIECES.
+    """
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(PIECES) for _ in range(rng.randint(0, words))) for _ in range(number)]
+
+
+def has_punkt():
+    """
+        True if the NLTK punkt model (needed by tokenizer="nltk") is installed.
+    """
+    try:
+        from nltk.tokenize import sent_tokenize
+        sent_tokenize("A test. Another one.")
+    except LookupError:
+        return False
+    return True
+
+
+# Tokenizers that can run here: "fast" always, "nltk" only with the punkt model.
+TOKENIZERS = ("fast", "nltk") if has_punkt() else ("fast",)
@@ -0,0 +1,72 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from readcalc.batch import score_many
+from readcalc.cache import ResultCache, make_key
+from readcalc.counts import ReadabilityCounts
+from readcalc.readcalc import ReadCalc
+
+from .helpers import make_texts
+
+
+class ScoreManyTest(unittest.TestCase):
+
+    def setUp(self):
+        # A few repeated texts, so that the cache has hits within a run
+        self.texts = make_texts(40, seed=3)
+        self.texts += self.texts[:5]
+        self.expected = [ReadCalc(text, tokenizer="fast").get_all_metrics() for text in self.texts]
+
+    def test_same_metrics_as_readcalc(self):
+        for workers in (1, 2):
+            self.assertEqual(list(score_many(self.texts, workers=workers, chunksize=4, tokenizer="fast")),
+                             self.expected)
+            unordered = sorted(score_many(self.texts, workers=workers, chunksize=4, ordered=False, tokenizer="fast"))
+            self.assertEqual([metrics for position, metrics in unordered], self.expected)
+
+    def test_cached_results(self):
+        for workers in (1, 2):
+            cache = ResultCache(max_entries=20)
+            for run in range(2):
+                self.assertEqual(list(score_many(self.texts, workers=workers, chunksize=4, tokenizer="fast",
+                                                 cache=cache)), self.expected)
+            self.assertGreater(cache.hits, 0)
+
+    def test_disk_cache(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "cache.sqlite")
+            cache = ResultCache(max_entries=2, path=path)
+            for text in self.texts:
+                ReadCalc(text, tokenizer="fast", cache=cache)
+            cache.close()
+
+            cache = ResultCache(max_entries=2, path=path)
+            for text, expected in zip(self.texts, self.expected):
+                self.assertEqual(ReadCalc(text, tokenizer="fast", cache=cache).get_all_metrics(), expected)
+            self.assertGreater(cache.disk_hits, 0)
+            cache.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_keys(self):
+        self.assertNotEqual(make_key("text"), make_key("text", preprocesshtml="fast"))
+        self.assertNotEqual(make_key("5"), make_key(5))
+
+    def test_merged_counts(self):
+        counts = [ReadCalc(text, tokenizer="fast").get_counts() for text in self.texts]
+        merged = ReadabilityCounts.merge_all(counts)
+        for field in ReadabilityCounts.fields:
+            self.assertEqual(getattr(merged, field), sum(getattr(part, field) for part in counts))
+        self.assertEqual(merged.types, set().union(*[part.types for part in counts]))
+        self.assertEqual(sum(counts), merged)
+        # Merging does not change the parts
+        self.assertEqual(counts[0], ReadCalc(self.texts[0], tokenizer="fast").get_counts())
+
+
+if __name__ == "__main__":
+    unittest.main()
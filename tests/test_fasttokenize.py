@@ -0,0 +1,34 @@
+# encoding: utf-8
+
+import unittest
+
+from readcalc import fasttokenize
+from readcalc.readcalc import _iter_words
+
+from .helpers import make_texts
+
+
+class FastTokenizeTest(unittest.TestCase):
+
+    def test_words_are_the_treebank_words(self):
+        for text in make_texts(200, seed=2):
+            self.assertEqual(list(fasttokenize.iter_words(text)), list(_iter_words(text)), text)
+
+    def test_sentences(self):
+        cases = [
+            ("Mr. Smith went to Washington. He said hi.", 2),
+            ("It was 3 p.m. on Jan. 5. The U.S. is big.", 2),
+            ("The answer was no. She left.", 2),
+            ("See No. 5 here.", 1),
+            ("Visit example.com. Then go home.", 2),
+            ("Version 2.0. It works.", 2),
+            ("Apples, pears etc. and more.", 1),
+            ("Apples, pears etc. Then more.", 2),
+            ("Then he left... and came back. Really? Yes!", 3),
+        ]
+        for text, number in cases:
+            self.assertEqual(len(fasttokenize.sent_tokenize(text)), number, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+# encoding: utf-8
+
+import io
+import random
+import unittest
+
+from readcalc.readcalc import ReadCalc
+from readcalc.stream import ReadCalcAccumulator
+
+from .helpers import TOKENIZERS, make_texts
+
+
+class ReadCalcAccumulatorTest(unittest.TestCase):
+
+    def feed(self, text, tokenizer, max_chunk=30, seed=0, **options):
+        rng = random.Random(seed)
+        acc = ReadCalcAccumulator(tokenizer=tokenizer, **options)
+        start = 0
+        while start < len(text):
+            end = start + rng.randint(1, max_chunk)
+            acc.feed(text[start:end])
+            start = end
+        return acc
+
+    def test_chunks_give_the_same_metrics_as_the_whole_text(self):
+        for tokenizer in TOKENIZERS:
+            for seed, text in enumerate(make_texts(100, seed=1)):
+                expected = ReadCalc(text, tokenizer=tokenizer).get_all_metrics()
+                acc = self.feed(text, tokenizer, seed=seed)
+                self.assertEqual(acc.result().get_all_metrics(), expected, (tokenizer, text))
+                acc.close()
+                self.assertEqual(acc.get_all_metrics(), expected, (tokenizer, text))
+
+    def test_long_sentences_are_counted_in_pieces(self):
+        # No sentence boundary for thousands of chars, with contractions right before the cuts
+        for tokenizer in TOKENIZERS:
+            for seed in range(4):
+                rng = random.Random(seed)
+                text = " ".join(rng.choice(["can't", "it's", "don't", "word", "he'd", "\n"]) for _ in range(2000))
+                acc = ReadCalcAccumulator(max_pending=500, tokenizer=tokenizer).consume(io.StringIO(text), 37)
+                self.assertEqual(acc.get_all_metrics(), ReadCalc(text, tokenizer=tokenizer).get_all_metrics())
+
+    def test_text_is_not_kept(self):
+        acc = ReadCalcAccumulator(tokenizer="fast").consume(["Some text. ", "More text."])
+        self.assertRaises(TypeError, acc.get_sentences)
+        self.assertRaises(TypeError, acc.get_words)
+
+
+if __name__ == "__main__":
+    unittest.main()
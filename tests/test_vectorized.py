@@ -0,0 +1,27 @@
+# encoding: utf-8
+
+import unittest
+
+from readcalc.readcalc import ReadCalc
+
+from .helpers import make_texts
+
+try:
+    from readcalc import vectorized
+except ImportError:
+    vectorized = None
+
+
+@unittest.skipIf(vectorized is None, "numpy is not installed")
+class VectorizedTest(unittest.TestCase):
+
+    def test_same_indices_as_readcalc(self):
+        calcs = [ReadCalc(text, tokenizer="fast") for text in make_texts(100, seed=4)] + [ReadCalc("", tokenizer="fast")]
+        indices = vectorized.compute_indices(**vectorized.metrics_to_columns(calc.get_all_metrics() for calc in calcs))
+        for i, calc in enumerate(calcs):
+            expected = calc.get_all_metrics()[11:] + (calc.get_dale_chall_known_fraction(),)
+            self.assertEqual(tuple(float(indices[name][i]) for name in vectorized.INDICES), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()